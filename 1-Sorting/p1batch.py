@@ -0,0 +1,147 @@
+"""
+Math 560
+Project 1
+Fall 2021
+
+p1batch.py
+"""
+
+# Import numpy for the vectorized compare-exchange steps.
+import numpy as np
+
+# Number of rows sorted together, small enough for the working set of a
+# stage to stay in cache.
+CHUNK_ROWS = 8192
+
+"""
+BatchSort
+
+This function sorts many short lists at once. The lists are given as the
+rows of a padded 2-D array, with lengths[r] giving the number of real
+values in row r. Every row is sorted by the same Batcher odd-even merge
+sorting network: the network is a fixed sequence of stages, each stage is a
+set of disjoint compare-exchange pairs of columns (i, j), and a whole stage
+is applied to a chunk of CHUNK_ROWS rows at once with NumPy, so the Python
+overhead is paid once per stage and chunk instead of once per list. Each
+chunk is transposed first, so that every column is contiguous in memory.
+
+Values are compared together with their original column, which makes the
+result stable and moves the padding (which gets the largest possible value
+and columns >= lengths[r]) to the end of each row. The values must be
+bools, ints or floats, and NaN values are not supported.
+
+INPUTS
+values:  a 2-D NumPy array (or array-like) of numbers, one list per row
+lengths: a 1-D array of row lengths, each between 0 and the row width
+         (default = None, every row is full)
+
+OUTPUTS
+sortedValues: a new array with the first lengths[r] entries of each row
+              sorted in ascending order, followed by the padding entries
+perm:         an int array of the same shape giving, for each position, the
+              column the value came from, so that
+              sortedValues[r] == values[r][perm[r]]
+"""
+def BatchSort(values, lengths=None):
+    vals = np.array(values, copy=True)
+    if vals.ndim != 2:
+        raise Exception('BatchSort needs a 2-D array of rows!')
+    if not (vals.dtype == np.bool_ or np.issubdtype(vals.dtype, np.integer) \
+            or np.issubdtype(vals.dtype, np.floating)):
+        raise Exception('BatchSort needs bools, ints or floats!')
+    numRows, width = vals.shape
+
+    # Each entry remembers the column it came from
+    perm = np.broadcast_to(np.arange(width), (numRows, width)).copy()
+
+    # Give the padding the largest possible value so it sorts last
+    if lengths is not None:
+        lengths = np.asarray(lengths)
+        if lengths.shape != (numRows,) or \
+           np.any(lengths < 0) or np.any(lengths > width):
+            raise Exception('BatchSort needs one length in [0, width] ' + \
+                            'per row!')
+        pad = perm >= lengths[:, None]
+        if vals.dtype == np.bool_:
+            vals[pad] = True
+        elif np.issubdtype(vals.dtype, np.floating):
+            vals[pad] = np.inf
+        else:
+            vals[pad] = np.iinfo(vals.dtype).max
+
+    # Sort each chunk of rows with the network, one stage at a time
+    stages = oddEvenMergeStages(width)
+    for lo in range(0, numRows, CHUNK_ROWS):
+        hi = min(lo + CHUNK_ROWS, numRows)
+        v = np.ascontiguousarray(vals[lo:hi].T)
+        p = np.ascontiguousarray(perm[lo:hi].T)
+        for I, J in stages:
+            a = v[I]
+            b = v[J]
+            pa = p[I]
+            pb = p[J]
+            swap = (a > b) | ((a == b) & (pa > pb))
+            v[I] = np.where(swap, b, a)
+            v[J] = np.where(swap, a, b)
+            p[I] = np.where(swap, pb, pa)
+            p[J] = np.where(swap, pa, pb)
+        vals[lo:hi] = v.T
+        perm[lo:hi] = p.T
+
+    # Put the original padding values back
+    if lengths is not None:
+        vals[pad] = np.asarray(values)[pad]
+    return vals, perm
+
+"""
+BatchSort helper functions:
+    oddEvenMergeStages
+"""
+
+# The network stages for each width, built once per width.
+NETWORKS = {}
+
+"""
+oddEvenMergeStages: this function returns the stages of Batcher's odd-even
+merge sorting network for width inputs. The network is built for the next
+power of two, and comparators that touch columns >= width are dropped: those
+columns would hold padding larger than everything else, already in order, so
+the dropped comparators would never swap.
+
+INPUTS
+width: the number of columns to sort
+
+OUTPUTS
+stages: a list of (I, J) pairs of int arrays; within a stage, the
+        comparators (I[k], J[k]) are disjoint and I[k] < J[k]
+"""
+def oddEvenMergeStages(width):
+    if width in NETWORKS:
+        return NETWORKS[width]
+
+    n = 1
+    while n < width:
+        n *= 2
+
+    stages = []
+    p = 1
+    while p < n:
+        k = p
+        while k >= 1:
+            I = []
+            J = []
+            for j in range(k % p, n - k, 2 * k):
+                for i in range(min(k, n - j - k)):
+                    lo = i + j
+                    hi = i + j + k
+                    # Only compare within the same merge of size 2p
+                    if lo // (2 * p) == hi // (2 * p) and hi < width:
+                        I.append(lo)
+                        J.append(hi)
+            if len(I) > 0:
+                stages.append((np.array(I), np.array(J)))
+            k //= 2
+        p *= 2
+
+    NETWORKS[width] = stages
+    return stages
@@ -0,0 +1,448 @@
+"""
+Math 560
+Project 1
+Fall 2021
+
+p1benchmark.py
+"""
+
+# Import time, random, statistics, tracemalloc for peak memory, and the
+# csv/json writers. Nothing here plots, so the benchmarks can run on hosts
+# without a display.
+import argparse
+import csv
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+# Import the sorting algorithms.
+from project1 import SelectionSort
+from project1 import InsertionSort
+from project1 import BinaryInsertionSort
+from project1 import BubbleSort
+from project1 import MergeSort
+from project1 import TimSort
+from project1 import InPlaceMergeSort
+from project1 import HeapSort
+from project1 import QuickSort
+from project1 import RadixSort
+from project1 import StringSort
+from p1instrument import instrumentSort
+import project1
+
+# The algorithms to benchmark, by name. 'Python' is the builtin list.sort.
+ALGS = {'SelectionSort': SelectionSort,
+        'InsertionSort': InsertionSort,
+        'BinaryInsertionSort': BinaryInsertionSort,
+        'BubbleSort': BubbleSort,
+        'MergeSort': MergeSort,
+        'TimSort': TimSort,
+        'InPlaceMergeSort': InPlaceMergeSort,
+        'HeapSort': HeapSort,
+        'QuickSort': QuickSort,
+        'RadixSort': RadixSort,
+        'StringSort': StringSort,
+        'Python': list.sort}
+
+# The O(n^2) algorithms, which are only run up to maxQuadraticN.
+QUADRATIC = ['SelectionSort', 'InsertionSort', 'BinaryInsertionSort', \
+             'BubbleSort']
+
+# The algorithms that only sort numbers, and the ones that only sort strings.
+NUMBER_ONLY = ['RadixSort']
+STRING_ONLY = ['StringSort']
+
+# Maximum number of elements copied ahead of one timed batch of sorts.
+COPY_ELEMENTS = 2**16
+
+# Default input sizes, from small lists up to large n.
+SIZES = [16, 64, 256, 1024, 4096, 16384, 65536, 262144, 1048576]
+
+# The columns written to the CSV file, in order.
+FIELDS = ['alg', 'family', 'n', 'number', 'repeats', 'median_ns', \
+          'q1_ns', 'q3_ns', 'iqr_ns', 'correct', 'comparisons', 'moves', \
+          'allocations', 'allocated', 'max_depth', 'peak_bytes']
+
+################################################################################
+
+"""
+Input families
+
+Each function takes the length n and a random.Random object and returns a
+new list of n numbers, or for the families in STRING_FAMILIES, a new list of
+n strings.
+"""
+
+def randomInput(n, rng):
+    return [rng.random() for x in range(n)]
+
+def sortedInput(n, rng):
+    return sorted(randomInput(n, rng))
+
+def reversedInput(n, rng):
+    return sorted(randomInput(n, rng), reverse=True)
+
+def fewUniqueInput(n, rng):
+    # Only 8 distinct values.
+    return [rng.randrange(8) for x in range(n)]
+
+def organPipeInput(n, rng):
+    # Ascending to the middle, then descending.
+    return list(range(n // 2)) + list(range(n - n // 2, 0, -1))
+
+def nearlySortedInput(n, rng):
+    # Sorted, then about 1% of the elements swapped with a random partner.
+    values = list(range(n))
+    for k in range(max(1, n // 100)):
+        a = rng.randrange(n)
+        b = rng.randrange(n)
+        values[a], values[b] = values[b], values[a]
+    return values
+
+def sharedPrefixInput(n, rng):
+    # Identifiers: one of 8 long dotted prefixes and a random numeric suffix.
+    prefixes = ['org.example.project%d.module.submodule.Class_' % k \
+                for k in range(8)]
+    return [rng.choice(prefixes) + '%08d' % rng.randrange(10**8) \
+            for x in range(n)]
+
+def genomeReadsInput(n, rng):
+    # Reads of 100 bases taken from random positions of a few 2000-base
+    # genomes, so reads from the same region share long prefixes.
+    basePairs = ['A', 'G', 'T', 'C']
+    genomes = [''.join([rng.choice(basePairs) for y in range(2000)]) \
+               for x in range(4)]
+    reads = []
+    for x in range(n):
+        genome = rng.choice(genomes)
+        start = rng.randrange(len(genome) - 100)
+        reads.append(genome[start:start + 100])
+    return reads
+
+# The input families, by name.
+FAMILIES = {'random': randomInput,
+            'sorted': sortedInput,
+            'reversed': reversedInput,
+            'fewUnique': fewUniqueInput,
+            'organPipe': organPipeInput,
+            'nearlySorted': nearlySortedInput,
+            'sharedPrefix': sharedPrefixInput,
+            'genomeReads': genomeReadsInput}
+
+# The families whose lists hold strings instead of numbers.
+STRING_FAMILIES = ['sharedPrefix', 'genomeReads']
+
+################################################################################
+
+"""
+timeSort
+
+This function times alg on copies of listToSort. One timing sample sorts
+number fresh copies back to back and is measured with perf_counter_ns; the
+copies are made before the clock starts, at most COPY_ELEMENTS elements'
+worth at a time (see timeSample). The inner loop count number is
+calibrated by doubling it until one sample takes at least minSampleNs, so
+that sorts of small lists are not lost in the timer resolution. After
+warmup untimed sorts, repeats samples are taken, and the median and
+interquartile range of the time per sort are returned.
+
+INPUTS
+alg:         the sorting function to time
+listToSort:  the input list, which is not changed
+repeats:     the number of timing samples (default = 7)
+warmup:      the number of untimed sorts before timing (default = 2)
+minSampleNs: the minimum duration of one sample in ns (default = 2ms)
+
+OUTPUTS
+stats: a dict with the keys number, repeats, median_ns, q1_ns, q3_ns,
+       iqr_ns and correct (whether every sort gave the right answer)
+"""
+def timeSort(alg, listToSort, repeats=7, warmup=2, minSampleNs=2000000):
+    expected = sorted(listToSort)
+    correct = True
+
+    # Warm up caches and the allocator with untimed sorts.
+    for k in range(warmup):
+        copiedList = listToSort.copy()
+        alg(copiedList)
+        correct = correct and copiedList == expected
+
+    # Calibrate the number of sorts per sample.
+    number = 1
+    while True:
+        elapsed = timeSample(alg, listToSort, number)
+        if elapsed >= minSampleNs or number >= 2**20:
+            break
+        number *= 2
+
+    # Take the timing samples, as ns per sort.
+    samples = []
+    for k in range(repeats):
+        samples.append(timeSample(alg, listToSort, number) / number)
+
+    # Check the result of one more sort.
+    copiedList = listToSort.copy()
+    alg(copiedList)
+    correct = correct and copiedList == expected
+
+    if repeats > 1:
+        q1, median, q3 = statistics.quantiles(samples, n=4)
+    else:
+        q1 = median = q3 = samples[0]
+    return {'number': number, 'repeats': repeats, 'median_ns': median, \
+            'q1_ns': q1, 'q3_ns': q3, 'iqr_ns': q3 - q1, 'correct': correct}
+
+"""
+timeSample: this function returns the time in ns that alg takes to sort
+number copies of listToSort one after another. The copies are made in
+batches of about COPY_ELEMENTS elements outside the timed loops, so small
+inputs with a large number do not keep up to a million lists alive at once.
+"""
+def timeSample(alg, listToSort, number):
+    batch = max(1, COPY_ELEMENTS // max(1, len(listToSort)))
+    elapsed = 0
+    for lo in range(0, number, batch):
+        copies = [listToSort.copy() for k in range(min(batch, number - lo))]
+        t = time.perf_counter_ns()
+        for copiedList in copies:
+            alg(copiedList)
+        elapsed += time.perf_counter_ns() - t
+        del copies
+    return elapsed
+
+"""
+peakMemory
+
+This function sorts one copy of the input list under tracemalloc and returns
+the peak number of bytes allocated during the sort, above what was allocated
+before it started. The copy itself is made before tracing starts, so only
+the algorithm's own buffers, temporary slices and call frames are counted.
+This run is not timed, since tracing slows Python down a lot.
+
+INPUTS
+alg:        the sorting function to measure
+listToSort: the input list, which is not modified
+
+OUTPUTS
+peak: the peak extra memory used by the sort, in bytes
+"""
+def peakMemory(alg, listToSort):
+    copiedList = listToSort.copy()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        alg(copiedList)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return peak
+
+"""
+runBenchmarks
+
+This function times every requested algorithm on every requested input
+family and size. The quadratic algorithms are skipped for n larger than
+maxQuadraticN, and algorithms are skipped on inputs whose element type
+(numbers or strings) they cannot sort. Each input is generated once per
+(family, n) from a fixed seed, so every algorithm sorts the same data. With
+instrument=True, one more untimed run per result counts comparisons, moves,
+allocations and call depth (see p1instrument.py). With memory=True, one more
+untimed run per result records the peak memory allocated while sorting (see
+peakMemory).
+
+INPUTS
+algs:          a list of algorithm names from ALGS (default = all)
+families:      a list of family names from FAMILIES (default = all)
+sizes:         a list of input sizes (default = SIZES)
+maxQuadraticN: the largest n for the quadratic algorithms (default = 4096)
+repeats:       the number of timing samples per result (default = 7)
+seed:          the random seed for the inputs (default = 1)
+verbose:       set to True to print each result as it is measured
+               (default = True)
+instrument:    set to True to add the work counters to each result
+               (default = False)
+memory:        set to True to add the peak memory in bytes to each result
+               (default = False)
+
+OUTPUTS
+results: a list of dicts, one per (alg, family, n), with the keys in FIELDS
+"""
+def runBenchmarks(algs=None, families=None, sizes=None, maxQuadraticN=4096, \
+                  repeats=7, seed=1, verbose=True, instrument=False, \
+                  memory=False):
+    # Set default values if None.
+    if algs is None:
+        algs = list(ALGS)
+    if families is None:
+        families = list(FAMILIES)
+    if sizes is None:
+        sizes = SIZES
+
+    results = []
+    for family in families:
+        for n in sizes:
+            listToSort = FAMILIES[family](n, random.Random(seed))
+            for name in algs:
+                if name in QUADRATIC and n > maxQuadraticN:
+                    continue
+                if name in NUMBER_ONLY and family in STRING_FAMILIES:
+                    continue
+                if name in STRING_ONLY and family not in STRING_FAMILIES:
+                    continue
+                result = {'alg': name, 'family': family, 'n': n}
+                result.update(timeSort(ALGS[name], listToSort, repeats))
+                if instrument and name != 'Python':
+                    _, counters = instrumentSort(ALGS[name], listToSort)
+                    result.update(counters.asDict())
+                if memory:
+                    result['peak_bytes'] = peakMemory(ALGS[name], listToSort)
+                results.append(result)
+                if verbose:
+                    printResult(result)
+    return results
+
+"""
+printResult: this function prints one benchmark result on one line.
+"""
+def printResult(result):
+    line = '%-20s %-13s n=%-8d median %14.0f ns   IQR %12.0f ns' \
+           % (result['alg'], result['family'], result['n'], \
+              result['median_ns'], result['iqr_ns'])
+    if 'comparisons' in result:
+        line += '   cmp %d  mov %d  alloc %d  depth %d' \
+                % (result['comparisons'], result['moves'], \
+                   result['allocated'], result['max_depth'])
+    if 'peak_bytes' in result:
+        line += '   peak %d B' % result['peak_bytes']
+    if not result['correct']:
+        line += '   NOT SORTED!'
+    print(line)
+    return
+
+"""
+writeJSON: this function writes a list of benchmark results to a JSON file.
+"""
+def writeJSON(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=1)
+    return
+
+"""
+writeCSV: this function writes a list of benchmark results to a CSV file with
+one row per result and the columns in FIELDS.
+"""
+def writeCSV(results, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
+    return
+
+"""
+calibrateDispatch
+
+This function measures the thresholds that sort in project1.py uses to pick
+an algorithm, by timing the candidate algorithms against each other around
+each decision:
+    SMALL_SORT_N:        the largest n (random floats) where
+                         BinaryInsertionSort beats QuickSort
+    RADIX_MIN_N:         the smallest n (random 32-bit ints) where RadixSort
+                         beats QuickSort
+    RADIX_MAX_KEY_BYTES: the widest int key range, in bytes, where RadixSort
+                         beats QuickSort at n = largeN
+    PRESORTED_RATIO:     the largest fraction of out-of-order neighbors
+                         where TimSort beats QuickSort at n = largeN
+    FEW_UNIQUE_RATIO:    the largest number of distinct values, as a fraction
+                         of project1.SAMPLE_SIZE, where three-way QuickSort
+                         beats QuickSort at n = largeN
+
+INPUTS
+largeN:  the input size for the fixed-size measurements (default = 16384)
+repeats: the number of timing samples per measurement (default = 5)
+seed:    the random seed for the inputs (default = 1)
+apply:   set to True to also set the thresholds in project1 (default = False)
+
+OUTPUTS
+thresholds: a dict from threshold name to measured value
+"""
+def calibrateDispatch(largeN=16384, repeats=5, seed=1, apply=False):
+    rng = random.Random(seed)
+    thresholds = {}
+
+    # Returns True if alg1 sorts listToSort faster than alg2.
+    def faster(alg1, alg2, listToSort):
+        t1 = timeSort(alg1, listToSort, repeats)['median_ns']
+        t2 = timeSort(alg2, listToSort, repeats)['median_ns']
+        return t1 < t2
+
+    # Three-way QuickSort, as a one-argument function.
+    def threeWayQuickSort(listToSort):
+        return QuickSort(listToSort, threeWay=True)
+
+    thresholds['SMALL_SORT_N'] = 0
+    for n in [16, 32, 64, 128, 256, 512, 1024]:
+        if faster(BinaryInsertionSort, QuickSort, randomInput(n, rng)):
+            thresholds['SMALL_SORT_N'] = n
+
+    thresholds['RADIX_MIN_N'] = None
+    for n in [256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536]:
+        values = [rng.randrange(-2**31, 2**31) for x in range(n)]
+        if faster(RadixSort, QuickSort, values):
+            thresholds['RADIX_MIN_N'] = n
+            break
+
+    thresholds['RADIX_MAX_KEY_BYTES'] = 0
+    for numBytes in range(1, 9):
+        values = [rng.randrange(2**(8*numBytes)) for x in range(largeN)]
+        if faster(RadixSort, QuickSort, values):
+            thresholds['RADIX_MAX_KEY_BYTES'] = numBytes
+
+    thresholds['PRESORTED_RATIO'] = 0.0
+    for swaps in [0.001, 0.003, 0.01, 0.02, 0.03, 0.05, 0.1, 0.2]:
+        values = list(range(largeN))
+        for k in range(int(swaps * largeN)):
+            a = rng.randrange(largeN)
+            b = rng.randrange(largeN)
+            values[a], values[b] = values[b], values[a]
+        disorder = sum(1 for i in range(largeN - 1) \
+                       if values[i + 1] < values[i]) / (largeN - 1)
+        if faster(TimSort, QuickSort, values):
+            thresholds['PRESORTED_RATIO'] = max(disorder, \
+                                                thresholds['PRESORTED_RATIO'])
+
+    thresholds['FEW_UNIQUE_RATIO'] = 0.0
+    for distinct in [2, 4, 8, 16, 32, 64]:
+        values = [rng.randrange(distinct) for x in range(largeN)]
+        if faster(threeWayQuickSort, QuickSort, values):
+            thresholds['FEW_UNIQUE_RATIO'] = distinct / project1.SAMPLE_SIZE
+
+    for name, value in thresholds.items():
+        print('%-20s %s' % (name, value))
+        if apply and value is not None:
+            setattr(project1, name, value)
+    return thresholds
+
+"""
+Main function.
+"""
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the sorts.')
+    parser.add_argument('--algs', nargs='+', choices=list(ALGS))
+    parser.add_argument('--families', nargs='+', choices=list(FAMILIES))
+    parser.add_argument('--sizes', nargs='+', type=int)
+    parser.add_argument('--max-quadratic-n', type=int, default=4096)
+    parser.add_argument('--repeats', type=int, default=7)
+    parser.add_argument('--instrument', action='store_true')
+    parser.add_argument('--memory', action='store_true')
+    parser.add_argument('--json', default='benchmark.json')
+    parser.add_argument('--csv', default='benchmark.csv')
+    args = parser.parse_args()
+
+    results = runBenchmarks(args.algs, args.families, args.sizes, \
+                            args.max_quadratic_n, args.repeats, \
+                            instrument=args.instrument, memory=args.memory)
+    writeJSON(results, args.json)
+    writeCSV(results, args.csv)
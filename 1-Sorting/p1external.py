@@ -0,0 +1,232 @@
+"""
+Math 560
+Project 1
+Fall 2021
+
+p1external.py
+"""
+
+# Import heapq for the k-way merge, itertools for buffered reads and writes,
+# array for fixed-width records, mmap for reading the runs, and os, shutil
+# and tempfile for the temporary run files.
+import heapq
+import itertools
+import mmap
+import os
+import shutil
+import tempfile
+from array import array
+
+# Import the in-memory sorts used for the runs.
+from project1 import MergeSort
+
+# Bytes one record costs while its run is sorted, apart from the record's own
+# itemsize: the number object (up to 36 bytes for a 64-bit int, rounded up to
+# 40 by the allocator), a pointer in the run list and one in the sorting
+# algorithm's auxiliary buffer. The raw bytes read from the file and the
+# array written back each add one itemsize (see recordBytes).
+BYTES_PER_OBJECT = 56
+
+# Bytes set aside from memoryLimit for what does not depend on the run size:
+# the buffers of the open files (8 KiB each), the merge generators and the
+# list of run files.
+FIXED_BYTES = 32 * 2**10
+
+# Default number of runs merged at once.
+DEFAULT_FAN_IN = 16
+
+"""
+ExternalSort
+
+This function sorts a binary file of fixed-width records that may be much
+larger than the available memory, and writes the result to another file.
+A record is one value stored as an array.array typecode, e.g. 'q' for signed
+64-bit integers or 'd' for 64-bit floats, in native byte order.
+
+The sort works in two phases:
+    1. Runs: the input is read runSize records at a time, each run is sorted
+       in memory with alg, and written to a temporary file.
+    2. Merges: up to fanIn runs at a time are memory-mapped and combined with
+       a heap-based k-way merge. Each run is read, and the output written,
+       through buffers of a bounded number of records. If there are more
+       than fanIn runs, intermediate merge passes write longer runs back to
+       temporary files until one final pass writes the output file.
+
+The memory used is bounded by memoryLimit. FIXED_BYTES of it are set aside
+for open files and bookkeeping; runs hold at most the rest, counted with the
+measured per-record cost of recordBytes, and a merge pass divides the rest
+between its fanIn input buffers and its output buffer. Limits not much
+larger than FIXED_BYTES cannot be met, since the list of run files also
+grows with the number of runs.
+
+INPUTS
+inFile:      the path of the binary file to sort
+outFile:     the path to write the sorted binary file to
+typecode:    the array typecode of the records (default = 'q')
+memoryLimit: the approximate peak memory in bytes (default = 64 MiB)
+runSize:     the number of records per run
+             (default = None, which fits a run in memoryLimit)
+fanIn:       the number of runs to merge at once (default = 16)
+alg:         the function used to sort each run, e.g. MergeSort or QuickSort
+             (default = MergeSort)
+tmpDir:      the directory for the temporary run files
+             (default = None, which uses the system temporary directory)
+
+OUTPUTS
+numRecords: the number of records sorted
+"""
+def ExternalSort(inFile, outFile, typecode='q', memoryLimit=64*2**20, \
+                 runSize=None, fanIn=None, alg=MergeSort, tmpDir=None):
+    # Set default values for runSize and fanIn if None.
+    recordLimit = max(0, memoryLimit - FIXED_BYTES)
+    if runSize is None:
+        runSize = max(1, recordLimit // recordBytes(typecode))
+    if fanIn is None:
+        fanIn = DEFAULT_FAN_IN
+    if fanIn < 2:
+        raise Exception('fanIn must be at least 2!')
+
+    # Each merge pass splits the memory between fanIn inputs and one output.
+    bufferRecords = max(1, recordLimit // \
+                           ((fanIn + 1) * recordBytes(typecode)))
+
+    # The input must hold a whole number of records.
+    itemsize = array(typecode).itemsize
+    if os.path.getsize(inFile) % itemsize != 0:
+        raise Exception('Input file size is not a multiple of the record size!')
+
+    runDir = tempfile.mkdtemp(dir=tmpDir)
+    try:
+        # Phase 1: sort runs in memory and spill them to temporary files.
+        runs, numRecords = createRuns(inFile, runDir, typecode, runSize, alg)
+
+        # Phase 2: merge fanIn runs at a time until at most fanIn are left.
+        passNum = 0
+        while len(runs) > fanIn:
+            merged = []
+            for group in range(0, len(runs), fanIn):
+                path = os.path.join(runDir, 'pass%d_%d.bin' % (passNum, group))
+                mergeRunFiles(runs[group:group + fanIn], path, typecode, \
+                              bufferRecords)
+                merged.append(path)
+            # The merged runs are no longer needed.
+            for path in runs:
+                os.remove(path)
+            runs = merged
+            passNum += 1
+
+        # Final merge into the output file.
+        mergeRunFiles(runs, outFile, typecode, bufferRecords)
+    finally:
+        shutil.rmtree(runDir, ignore_errors=True)
+
+    return numRecords
+
+"""
+ExternalSort helper functions:
+    recordBytes
+    createRuns
+    readRun
+    mergeRunFiles
+"""
+
+"""
+recordBytes: this function returns the approximate peak number of bytes one
+record costs while it is held in memory: as a Python number in a run being
+sorted, or in a merge buffer.
+
+INPUTS
+typecode: the array typecode of the records
+
+OUTPUTS
+numBytes: the number of bytes per record
+"""
+def recordBytes(typecode):
+    return BYTES_PER_OBJECT + 2 * array(typecode).itemsize
+
+"""
+createRuns: this function reads inFile runSize records at a time, sorts each
+run with alg, and writes each sorted run to its own file in runDir.
+
+INPUTS
+inFile:   the path of the binary file to sort
+runDir:   the directory to write the run files to
+typecode: the array typecode of the records
+runSize:  the number of records per run
+alg:      the function used to sort each run
+
+OUTPUTS
+runs:       the list of run file paths
+numRecords: the total number of records read
+"""
+def createRuns(inFile, runDir, typecode, runSize, alg):
+    itemsize = array(typecode).itemsize
+    runs = []
+    numRecords = 0
+    with open(inFile, 'rb') as f:
+        while True:
+            data = f.read(runSize * itemsize)
+            if len(data) == 0:
+                break
+
+            # Sort the run in memory.
+            run = array(typecode, data).tolist()
+            alg(run)
+            numRecords += len(run)
+
+            # Spill the sorted run as fixed-width binary.
+            path = os.path.join(runDir, 'run%d.bin' % len(runs))
+            with open(path, 'wb') as runFile:
+                array(typecode, run).tofile(runFile)
+            runs.append(path)
+            del run
+    return runs, numRecords
+
+"""
+readRun: this generator memory-maps a run file and yields its records in
+order, converting bufferRecords records at a time to Python numbers.
+
+INPUTS
+path:          the path of the run file
+typecode:      the array typecode of the records
+bufferRecords: the number of records to convert at a time
+
+OUTPUTS
+yields each record of the run in order
+"""
+def readRun(path, typecode, bufferRecords):
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            base = memoryview(mm)
+            view = base.cast('B').cast(typecode)
+            try:
+                for lo in range(0, len(view), bufferRecords):
+                    yield from view[lo:lo + bufferRecords].tolist()
+            finally:
+                # The map cannot close while views of it are still open.
+                view.release()
+                base.release()
+
+"""
+mergeRunFiles: this function merges sorted run files into one sorted file,
+reading each run through a buffer of bufferRecords records and writing the
+output through a buffer of the same size.
+
+INPUTS
+runs:          the list of sorted run file paths
+outFile:       the path to write the merged file to
+typecode:      the array typecode of the records
+bufferRecords: the number of records per input and output buffer
+
+There is no explicit return value.
+"""
+def mergeRunFiles(runs, outFile, typecode, bufferRecords):
+    merged = heapq.merge(*[readRun(path, typecode, bufferRecords) \
+                           for path in runs])
+    with open(outFile, 'wb') as f:
+        while True:
+            chunk = list(itertools.islice(merged, bufferRecords))
+            if len(chunk) == 0:
+                break
+            array(typecode, chunk).tofile(f)
+    return
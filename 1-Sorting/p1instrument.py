@@ -0,0 +1,245 @@
+"""
+Math 560
+Project 1
+Fall 2021
+
+p1instrument.py
+"""
+
+# Import sys for the profiling hook that tracks call depth.
+import sys
+
+# The Counters object of the instrumented sort currently running, if any.
+active = None
+
+# The path of project1.py, whose calls are tracked (set by instrumentSort).
+projectFile = None
+
+"""
+Counters Class
+"""
+class Counters:
+
+    """
+    Class attributes:
+
+    comparisons # The number of comparisons between elements.
+    moves       # The number of element writes into lists owned by the sort.
+    allocations # The number of auxiliary lists allocated by slicing.
+    allocated   # The total number of elements in those auxiliary lists.
+    maxDepth    # The deepest nesting of calls to project1 functions.
+    depth       # The current nesting of calls to project1 functions.
+    """
+
+    """
+    __init__ function to initialize the counters to zero.
+    """
+    def __init__(self):
+        self.comparisons = 0
+        self.moves = 0
+        self.allocations = 0
+        self.allocated = 0
+        self.maxDepth = 0
+        self.depth = 0
+        return
+
+    """
+    __repr__ function to print the counters on one line.
+    """
+    def __repr__(self):
+        return ('comparisons: %d, moves: %d, allocations: %d ' + \
+                '(%d elements), max depth: %d') % \
+               (self.comparisons, self.moves, self.allocations, \
+                self.allocated, self.maxDepth)
+
+    """
+    asDict function to return the counters as a dict, e.g. for benchmarks.
+    """
+    def asDict(self):
+        return {'comparisons': self.comparisons, 'moves': self.moves, \
+                'allocations': self.allocations, 'allocated': self.allocated, \
+                'max_depth': self.maxDepth}
+
+################################################################################
+
+"""
+Counted values
+
+Elements are wrapped in subclasses of their own type (int, float or str)
+whose comparison operators add one to active.comparisons, so they still pass
+isinstance checks and can still be packed into arrays. Any other element is
+wrapped in a CountedValue object that holds it. Wrapped values that outlive
+instrumentSort (e.g. kept by a key function) still compare, uncounted.
+"""
+
+"""
+countComparison: this function counts one comparison and returns its result.
+"""
+def countComparison(result):
+    if active is not None:
+        active.comparisons += 1
+    return result
+
+class CountedInt(int):
+    __hash__ = int.__hash__
+    def __lt__(self, other): return countComparison(int.__lt__(self, other))
+    def __le__(self, other): return countComparison(int.__le__(self, other))
+    def __gt__(self, other): return countComparison(int.__gt__(self, other))
+    def __ge__(self, other): return countComparison(int.__ge__(self, other))
+    def __eq__(self, other): return countComparison(int.__eq__(self, other))
+    def __ne__(self, other): return countComparison(int.__ne__(self, other))
+
+class CountedFloat(float):
+    __hash__ = float.__hash__
+    def __lt__(self, other): return countComparison(float.__lt__(self, other))
+    def __le__(self, other): return countComparison(float.__le__(self, other))
+    def __gt__(self, other): return countComparison(float.__gt__(self, other))
+    def __ge__(self, other): return countComparison(float.__ge__(self, other))
+    def __eq__(self, other): return countComparison(float.__eq__(self, other))
+    def __ne__(self, other): return countComparison(float.__ne__(self, other))
+
+class CountedStr(str):
+    __hash__ = str.__hash__
+    def __lt__(self, other): return countComparison(str.__lt__(self, other))
+    def __le__(self, other): return countComparison(str.__le__(self, other))
+    def __gt__(self, other): return countComparison(str.__gt__(self, other))
+    def __ge__(self, other): return countComparison(str.__ge__(self, other))
+    def __eq__(self, other): return countComparison(str.__eq__(self, other))
+    def __ne__(self, other): return countComparison(str.__ne__(self, other))
+
+class CountedValue:
+    __slots__ = ['val']
+    def __init__(self, val): self.val = val
+    def __repr__(self): return repr(self.val)
+    def __hash__(self): return hash(self.val)
+    def __lt__(self, other): return countComparison(self.val < other.val)
+    def __le__(self, other): return countComparison(self.val <= other.val)
+    def __gt__(self, other): return countComparison(self.val > other.val)
+    def __ge__(self, other): return countComparison(self.val >= other.val)
+    def __eq__(self, other): return countComparison(self.val == other.val)
+    def __ne__(self, other): return countComparison(self.val != other.val)
+
+# The wrapper for each exact element type, and the inverse mapping.
+WRAPPERS = {int: CountedInt, float: CountedFloat, str: CountedStr}
+UNWRAPPERS = {CountedInt: int, CountedFloat: float, CountedStr: str}
+
+"""
+wrap: this function returns x wrapped so that its comparisons are counted.
+"""
+def wrap(x):
+    return WRAPPERS.get(type(x), CountedValue)(x)
+
+"""
+unwrap: this function returns the original value of a wrapped element. Values
+that a sort created itself (e.g. RadixSort) are returned unchanged.
+"""
+def unwrap(x):
+    if type(x) is CountedValue:
+        return x.val
+    return UNWRAPPERS.get(type(x), lambda y: y)(x)
+
+################################################################################
+
+"""
+CountingList Class
+
+A list that counts every element written through item or slice assignment as
+a move, and returns slices as new CountingLists, each counted as an
+auxiliary allocation. Since sorts make their buffers by slicing the input,
+writes into those buffers are counted too.
+"""
+class CountingList(list):
+
+    """
+    __setitem__ function to count the elements written.
+    """
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            if active is not None:
+                active.moves += len(value)
+        elif active is not None:
+            active.moves += 1
+        list.__setitem__(self, index, value)
+        return
+
+    """
+    __getitem__ function to count slices as auxiliary allocations.
+    """
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            result = CountingList(list.__getitem__(self, index))
+            if active is not None:
+                active.allocations += 1
+                active.allocated += len(result)
+            return result
+        return list.__getitem__(self, index)
+
+    """
+    copy function to count copies as auxiliary allocations.
+    """
+    def copy(self):
+        return self[:]
+
+################################################################################
+
+"""
+trackDepth: this function is the sys.setprofile hook. It tracks how deeply
+calls to Python functions defined in project1.py are nested.
+"""
+def trackDepth(frame, event, arg):
+    if frame.f_code.co_filename != projectFile:
+        return
+    if event == 'call':
+        active.depth += 1
+        if active.depth > active.maxDepth:
+            active.maxDepth = active.depth
+    elif event == 'return':
+        active.depth -= 1
+    return
+
+"""
+instrumentSort
+
+This function sorts a copy of listToSort with alg while counting the work it
+does. The copy holds wrapped elements in a CountingList, and a profiling hook
+tracks the call depth, so the sorting algorithms themselves are unchanged
+and run with no overhead when they are not instrumented. The counts cover
+comparisons between elements, element writes into the list and any buffers
+the sort slices from it (a swap counts as two moves), those buffers as
+auxiliary allocations, and the deepest nesting of project1 calls. Work done
+on lists the sort builds by other means (e.g. the keys of RadixSort, or the
+decorated pairs of key= sorts) is not counted as moves.
+
+INPUTS
+alg:        the sorting function to instrument
+listToSort: the input list, which is not changed
+**kwargs:   any extra options to pass on to alg
+
+OUTPUTS
+sortedList: a sorted copy of listToSort
+counters:   the Counters object for the run
+"""
+def instrumentSort(alg, listToSort, **kwargs):
+    global active, projectFile
+    counters = Counters()
+
+    # Import project1 here, since project1 itself imports this module.
+    import project1
+    projectFile = project1.__file__
+    copiedList = CountingList([wrap(x) for x in listToSort])
+
+    # Count only the work done while alg runs.
+    previous = sys.getprofile()
+    active = counters
+    sys.setprofile(trackDepth)
+    try:
+        alg(copiedList, **kwargs)
+    finally:
+        sys.setprofile(previous)
+        active = None
+
+    # Leave out the call to alg itself from the depth.
+    counters.maxDepth = max(0, counters.maxDepth - 1)
+    sortedList = [unwrap(x) for x in list.__iter__(copiedList)]
+    return sortedList, counters
@@ -0,0 +1,276 @@
+"""
+Math 560
+Project 1
+Fall 2021
+
+p1parallel.py
+"""
+
+# Import heapq for the k-way merge, random and bisect for sample sort,
+# array for typed copies, and multiprocessing for the worker pool and the
+# shared memory blocks.
+import heapq
+import random
+from array import array
+from bisect import bisect_left, bisect_right
+from multiprocessing import Pool, cpu_count, shared_memory
+
+# Number of samples taken per bucket when choosing sample sort splitters.
+OVERSAMPLE = 32
+
+"""
+ParallelSort
+
+This function sorts an input list in place using a pool of worker processes.
+The list is split into one chunk per process, each chunk is sorted by a
+worker, and the sorted chunks are combined in the parent process.
+
+When every value is an int that fits in 64 bits, or every value is a float,
+the values are copied once into a multiprocessing.shared_memory block and the
+workers sort their chunks of that block directly, so no chunk data is pickled
+between processes. Other lists fall back to sending each chunk to its worker.
+
+There are two ways to split and combine the chunks:
+    'merge':  split into equal-sized chunks and combine them with a heap-based
+              k-way merge.
+    'sample': pick splitters from a random sample and split the values into
+              buckets of similar size, with every value in a bucket no larger
+              than every value in the next bucket. The sorted buckets are
+              simply concatenated.
+
+The k-way merge of 'merge' and the bucket split of 'sample' both run serially
+in the parent process, so they bound the speedup. measureSpeedup reports
+their time separately.
+
+INPUTS
+listToSort: an input list that may be sorted or unsorted
+numProcs:   the number of worker processes (default = number of cores)
+alg:        the function used to sort each chunk, e.g. MergeSort or QuickSort
+            (default = None, which uses the builtin list.sort)
+method:     'merge' or 'sample' (default = 'merge')
+
+OUTPUTS
+listToSort: the input list, sorted
+"""
+def ParallelSort(listToSort, numProcs=None, alg=None, method='merge'):
+    # Make sure the method is valid.
+    if method != 'merge' and method != 'sample':
+        raise Exception('Incorrect method! Need merge or sample!')
+
+    # Set default value for numProcs if None.
+    if numProcs is None:
+        numProcs = cpu_count()
+
+    # Sort serially if there is nothing to split
+    list_length = len(listToSort)
+    if numProcs < 2 or list_length < 2 * numProcs:
+        sortChunk(listToSort, alg)
+        return listToSort
+
+    # Split the values into chunks, given as (lo, hi) index pairs into values
+    if method == 'sample':
+        values, bounds = sampleBuckets(listToSort, numProcs)
+    else:
+        values = listToSort
+        step = -(-list_length // numProcs)
+        bounds = [(lo, min(lo + step, list_length)) \
+                  for lo in range(0, list_length, step)]
+
+    typecode = sharedTypecode(values)
+    if typecode is None:
+        # Send each chunk to a worker and collect the sorted copies
+        with Pool(numProcs) as pool:
+            chunks = pool.starmap(sortCopiedChunk, \
+                                  [(values[lo:hi], alg) for lo, hi in bounds])
+    else:
+        # Sort the chunks inside one shared memory block
+        chunks = sortSharedChunks(values, bounds, typecode, alg, numProcs)
+
+    # Combine the sorted chunks
+    listToSort[:] = combineChunks(chunks, method)
+    return listToSort
+
+"""
+ParallelSort helper functions:
+    sortChunk
+    sortCopiedChunk
+    sortSharedChunk
+    sortSharedChunks
+    sharedTypecode
+    sampleBuckets
+    combineChunks
+"""
+
+"""
+sortChunk: this function sorts a list in place with alg, or with the builtin
+list.sort if alg is None.
+
+INPUTS
+chunk: the list to sort
+alg:   the sorting function to use, or None
+
+There is no explicit return value.
+"""
+def sortChunk(chunk, alg):
+    if alg is None:
+        chunk.sort()
+    else:
+        alg(chunk)
+    return
+
+"""
+sortCopiedChunk: this function runs in a worker process and sorts a chunk
+that was pickled and sent to it.
+
+INPUTS
+chunk: the list to sort
+alg:   the sorting function to use, or None
+
+OUTPUTS
+chunk: the sorted list
+"""
+def sortCopiedChunk(chunk, alg):
+    sortChunk(chunk, alg)
+    return chunk
+
+"""
+sortSharedChunk: this function runs in a worker process. It attaches to the
+shared memory block called name, sorts the values in [lo, hi) and writes
+them back into the block.
+
+INPUTS
+name:     the name of the shared memory block
+typecode: the array typecode of the values in the block ('q' or 'd')
+lo:       the first index of the chunk
+hi:       one past the last index of the chunk
+alg:      the sorting function to use, or None
+
+There is no explicit return value.
+"""
+def sortSharedChunk(name, typecode, lo, hi, alg):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        # Release the view before closing, even if the sort raises
+        with shm.buf.cast(typecode) as buf:
+            chunk = buf[lo:hi].tolist()
+            sortChunk(chunk, alg)
+            buf[lo:hi] = array(typecode, chunk)
+    finally:
+        shm.close()
+    return
+
+"""
+sortSharedChunks: this function copies values into a new shared memory
+block, has a pool of workers sort every chunk of the block, and copies the
+sorted chunks back out. The block is always unlinked before returning.
+Note: the block is created before the pool so that the workers share the
+parent's resource tracker instead of each starting (and leaking from) their
+own.
+
+INPUTS
+values:   the list of values to sort
+bounds:   a list of (lo, hi) pairs, one per chunk
+typecode: the array typecode of the values ('q' or 'd')
+alg:      the sorting function to use, or None
+numProcs: the number of worker processes
+
+OUTPUTS
+chunks: a list of sorted lists, one per chunk
+"""
+def sortSharedChunks(values, bounds, typecode, alg, numProcs):
+    data = array(typecode, values)
+    shm = shared_memory.SharedMemory(create=True, \
+                                     size=len(data) * data.itemsize)
+    try:
+        # Release the view before closing, even if a worker raises
+        with shm.buf.cast(typecode) as buf:
+            buf[:len(data)] = data
+            with Pool(numProcs) as pool:
+                pool.starmap(sortSharedChunk, \
+                             [(shm.name, typecode, lo, hi, alg) \
+                              for lo, hi in bounds])
+            chunks = [buf[lo:hi].tolist() for lo, hi in bounds]
+    finally:
+        shm.close()
+        shm.unlink()
+    return chunks
+
+"""
+sharedTypecode: this function returns the array typecode that can hold every
+value in the list: 'q' if all values are 64-bit ints, 'd' if all values are
+floats, and None otherwise.
+
+INPUTS
+values: a list of values
+
+OUTPUTS
+typecode: 'q', 'd', or None
+"""
+def sharedTypecode(values):
+    if all(type(x) is int for x in values):
+        if -2**63 <= min(values) and max(values) < 2**63:
+            return 'q'
+    elif all(type(x) is float for x in values):
+        return 'd'
+    return None
+
+"""
+sampleBuckets: this function splits a list into numBuckets buckets for
+sample sort. It sorts a random sample of (value, index) pairs, takes evenly
+spaced sample pairs as splitters, and places every value in the bucket given
+by a binary search among the splitters. The index breaks ties between equal
+values, so a value that occurs many times is spread over several buckets
+instead of filling one. The sample is drawn with a private random.Random, so
+the caller's random state is not changed.
+
+INPUTS
+listToSort: the list of values to split
+numBuckets: the number of buckets
+
+OUTPUTS
+values: the values, reordered so that each bucket is contiguous
+bounds: a list of (lo, hi) pairs giving each bucket's range in values
+"""
+def sampleBuckets(listToSort, numBuckets):
+    # Choose the splitters from a sorted random sample of (value, index)
+    rng = random.Random()
+    positions = rng.sample(range(len(listToSort)), \
+                           min(len(listToSort), OVERSAMPLE * numBuckets))
+    sample = sorted([(listToSort[i], i) for i in positions])
+    step = len(sample) / numBuckets
+    splitters = [sample[int(k * step)] for k in range(1, numBuckets)]
+    splitValues = [val for val, i in splitters]
+
+    # Place every value in its bucket. Only values equal to a splitter value
+    # need their index to break the tie.
+    buckets = [[] for k in range(numBuckets)]
+    for i, val in enumerate(listToSort):
+        b = bisect_left(splitValues, val)
+        if b < len(splitValues) and splitValues[b] == val:
+            b = bisect_right(splitters, (val, i), b)
+        buckets[b].append(val)
+
+    # Concatenate the buckets and record their ranges
+    values = []
+    bounds = []
+    for bucket in buckets:
+        bounds.append((len(values), len(values) + len(bucket)))
+        values.extend(bucket)
+    return values, bounds
+
+"""
+combineChunks: this function combines the sorted chunks into one sorted
+list, in the parent process. The buckets of 'sample' are concatenated, and
+the chunks of 'merge' go through a heap-based k-way merge.
+
+INPUTS
+chunks: a list of sorted lists
+method: 'merge' or 'sample'
+
+OUTPUTS
+combined: one sorted list of all the values
+"""
+def combineChunks(chunks, method):
+    if method == 'sample':
+        return [val for chunk in chunks for val in chunk]
+    return list(heapq.merge(*chunks))
@@ -0,0 +1,347 @@
+"""
+Math 560
+Project 1
+Fall 2021
+
+p1sortedlist.py
+"""
+
+# Import bisect to search within blocks, and the project's merge sort for
+# bulk loads.
+from bisect import bisect_left, bisect_right, insort_right
+from project1 import MergeSort
+from project1 import mergeRuns
+
+# Default block size. Blocks are split when they grow past twice this size
+# and joined with a neighbor when they shrink below half of it.
+DEFAULT_LOAD = 1000
+
+"""
+SortedList Class
+
+A list that keeps its values in ascending order as values are added and
+removed, so that a sorted view of a stream never has to be re-sorted. The
+values are stored as a list of sorted blocks of about load values each,
+together with the largest value of each block (maxes) and a Fenwick tree of
+the block lengths (index) that maps positions to blocks. With b = n / load
+blocks:
+    add, remove, discard     O(log b + load) (a bisect and a list insert)
+    bisectLeft, bisectRight  O(log b + log load)
+    rank, count              O(log b + log load)
+    sl[i], pop(i)            O(log b) to find the block, plus the above
+Splitting or joining a block invalidates the index, which is rebuilt in O(b)
+the next time a position is needed; this happens at most once per load/2
+updates. update() with a batch that is large compared to the list sorts the
+batch with MergeSort and merges it into the values with mergeRuns.
+
+Values must be mutually comparable with <. Equal values keep the order in
+which they were added.
+"""
+class SortedList:
+
+    """
+    Class attributes:
+    lists    # The sorted blocks of values.
+    maxes    # The largest (last) value of each block.
+    index    # Fenwick tree of the block lengths, or None if out of date.
+    numElems # The total number of values.
+    load     # The target block size.
+    """
+
+    """
+    __init__ function to initialize the SortedList, optionally with the
+    values of an iterable.
+    """
+    def __init__(self, iterable=None, load=DEFAULT_LOAD):
+        self.lists = []
+        self.maxes = []
+        self.index = None
+        self.numElems = 0
+        self.load = load
+        if iterable is not None:
+            self.update(iterable)
+        return
+
+    """
+    __repr__ function to print the SortedList.
+    """
+    def __repr__(self):
+        return 'SortedList(' + repr(list(self)) + ')'
+
+    """
+    __len__ function to return the number of values.
+    """
+    def __len__(self):
+        return self.numElems
+
+    """
+    __iter__ function to iterate over the values in ascending order.
+    """
+    def __iter__(self):
+        for block in self.lists:
+            yield from block
+
+    """
+    __contains__ function to check if a value equal to val is in the list.
+    """
+    def __contains__(self, val):
+        i = bisect_left(self.maxes, val)
+        if i == len(self.maxes):
+            return False
+        block = self.lists[i]
+        return block[bisect_left(block, val)] == val
+
+    """
+    __getitem__ function to return the value at position pos (negative
+    positions count from the end).
+
+    Raises an IndexError if pos is out of range.
+    """
+    def __getitem__(self, pos):
+        i, j = self.locate(pos)
+        return self.lists[i][j]
+
+    """
+    add function to insert val after any values equal to it.
+
+    There is no return value.
+    """
+    def add(self, val):
+        if not self.maxes:
+            self.lists.append([val])
+            self.maxes.append(val)
+            self.index = None
+        else:
+            # Find the first block whose max is larger than val
+            i = bisect_right(self.maxes, val)
+            if i == len(self.maxes):
+                # val is a new maximum: append to the last block
+                i -= 1
+                self.lists[i].append(val)
+                self.maxes[i] = val
+            else:
+                insort_right(self.lists[i], val)
+            self.updateIndex(i, 1)
+
+            # Split the block if it has grown too large
+            if len(self.lists[i]) > 2 * self.load:
+                self.split(i)
+        self.numElems += 1
+        return
+
+    """
+    update function to insert every value of an iterable.
+
+    Small batches are added one at a time. A batch with at least a quarter
+    as many values as the list is instead sorted with MergeSort, merged
+    with the current values by mergeRuns, and cut into new blocks.
+
+    There is no return value.
+    """
+    def update(self, iterable):
+        values = list(iterable)
+        if 4 * len(values) < self.numElems:
+            for val in values:
+                self.add(val)
+            return
+
+        # Bulk load: sort the batch and merge it after the current values
+        MergeSort(values)
+        src = list(self) + values
+        dst = src[:]
+        mergeRuns(src, dst, 0, self.numElems, len(src))
+
+        # Cut the merged values into blocks of load values
+        self.lists = [dst[k:k + self.load] \
+                      for k in range(0, len(dst), self.load)]
+        self.maxes = [block[-1] for block in self.lists]
+        self.index = None
+        self.numElems = len(dst)
+        return
+
+    """
+    remove function to remove one value equal to val.
+
+    Raises a ValueError if no value is equal to val.
+    There is no return value.
+    """
+    def remove(self, val):
+        if not self.discard(val):
+            raise ValueError('%r not in SortedList' % (val,))
+        return
+
+    """
+    discard function to remove one value equal to val, if there is one.
+
+    Returns True if a value was removed, and False otherwise.
+    """
+    def discard(self, val):
+        i = bisect_left(self.maxes, val)
+        if i == len(self.maxes):
+            return False
+        j = bisect_left(self.lists[i], val)
+        if not self.lists[i][j] == val:
+            return False
+        self.deleteAt(i, j)
+        return True
+
+    """
+    pop function to remove and return the value at position pos (default
+    = -1, the largest value).
+
+    Raises an IndexError if pos is out of range.
+    """
+    def pop(self, pos=-1):
+        i, j = self.locate(pos)
+        val = self.lists[i][j]
+        self.deleteAt(i, j)
+        return val
+
+    """
+    bisectLeft function to return the position where val would be inserted
+    before any values equal to it.
+    """
+    def bisectLeft(self, val):
+        i = bisect_left(self.maxes, val)
+        if i == len(self.maxes):
+            return self.numElems
+        return self.prefixLength(i) + bisect_left(self.lists[i], val)
+
+    """
+    bisectRight function to return the position where val would be inserted
+    after any values equal to it.
+    """
+    def bisectRight(self, val):
+        i = bisect_right(self.maxes, val)
+        if i == len(self.maxes):
+            return self.numElems
+        return self.prefixLength(i) + bisect_right(self.lists[i], val)
+
+    """
+    rank function to return the number of values less than val.
+    """
+    def rank(self, val):
+        return self.bisectLeft(val)
+
+    """
+    count function to return the number of values equal to val.
+    """
+    def count(self, val):
+        return self.bisectRight(val) - self.bisectLeft(val)
+
+    """
+    deleteAt function to delete the value at position j of block i, and to
+    join the block with a neighbor if it has become too small.
+
+    There is no return value.
+    """
+    def deleteAt(self, i, j):
+        block = self.lists[i]
+        del block[j]
+        self.numElems -= 1
+        self.updateIndex(i, -1)
+
+        if not block:
+            # Drop the empty block
+            del self.lists[i]
+            del self.maxes[i]
+            self.index = None
+        else:
+            self.maxes[i] = block[-1]
+            if len(block) < self.load // 2 and len(self.lists) > 1:
+                # Join with the next block, or the previous one at the end
+                if i == len(self.lists) - 1:
+                    i -= 1
+                self.lists[i].extend(self.lists[i + 1])
+                self.maxes[i] = self.maxes[i + 1]
+                del self.lists[i + 1]
+                del self.maxes[i + 1]
+                self.index = None
+                if len(self.lists[i]) > 2 * self.load:
+                    self.split(i)
+        return
+
+    """
+    split function to split block i into two halves.
+
+    There is no return value.
+    """
+    def split(self, i):
+        block = self.lists[i]
+        half = block[self.load:]
+        del block[self.load:]
+        self.maxes[i] = block[-1]
+        self.lists.insert(i + 1, half)
+        self.maxes.insert(i + 1, half[-1])
+        self.index = None
+        return
+
+    """
+    buildIndex function to rebuild the Fenwick tree of block lengths in
+    O(b). Entry k (1-based) holds the total length of blocks k - lowbit(k)
+    through k - 1 (0-based), where lowbit(k) = k & -k.
+
+    There is no return value.
+    """
+    def buildIndex(self):
+        tree = [0] + [len(block) for block in self.lists]
+        for k in range(1, len(tree)):
+            parent = k + (k & -k)
+            if parent < len(tree):
+                tree[parent] += tree[k]
+        self.index = tree
+        return
+
+    """
+    updateIndex function to add delta to the length of block i in the
+    Fenwick tree, if the tree is up to date.
+
+    There is no return value.
+    """
+    def updateIndex(self, i, delta):
+        if self.index is None:
+            return
+        k = i + 1
+        while k < len(self.index):
+            self.index[k] += delta
+            k += k & -k
+        return
+
+    """
+    prefixLength function to return the total length of the blocks before
+    block i.
+    """
+    def prefixLength(self, i):
+        if self.index is None:
+            self.buildIndex()
+        total = 0
+        k = i
+        while k > 0:
+            total += self.index[k]
+            k -= k & -k
+        return total
+
+    """
+    locate function to convert a position into a block number and an offset
+    within that block, by walking down the Fenwick tree.
+
+    Raises an IndexError if pos is out of range.
+    """
+    def locate(self, pos):
+        if pos < 0:
+            pos += self.numElems
+        if pos < 0 or pos >= self.numElems:
+            raise IndexError('SortedList index out of range')
+        if self.index is None:
+            self.buildIndex()
+
+        # Find the last block i whose prefix length is at most pos
+        i = 0
+        step = 1 << (len(self.index) - 1).bit_length()
+        while step:
+            k = i + step
+            if k < len(self.index) and self.index[k] <= pos:
+                i = k
+                pos -= self.index[k]
+            step >>= 1
+        return i, pos
@@ -1,3 +1,16 @@
+# Import bisect for binary searches within sorted runs, array for
+# reinterpreting floats as integer bit patterns, heapq for streaming top-k,
+# logging for the choices made by sort, and isqrt for buffer sizes.
+import heapq
+import logging
+from bisect import bisect_left, bisect_right
+from math import isqrt
+from array import array
+
+# Ranges with at most this many elements are sorted with binary insertion
+# sort by MergeSort and QuickSort.
+INSERTION_CUTOFF = 16
+
 """
 SelectionSort
 
@@ -7,11 +20,18 @@ the end of the "sorted" portion of the list.
 
 INPUTS
 listToSort: an input list that may be sorted or unsorted
+key: a function of one argument used to extract a comparison key from each
+    element, called once per element (default = None, compare elements)
+reverse: set to True to sort in descending order (default = False)
 
 OUTPUTS
 listToSort: the input list sorted in place
 """
-def SelectionSort(listToSort):
+def SelectionSort(listToSort, key=None, reverse=False):
+    # Sort decorated copies of the elements if a key or reverse is given
+    if key is not None or reverse:
+        return sortByKey(SelectionSort, listToSort, key, reverse)
+
     # Calculate length of input list, which will be used for 2 different 
     # for loops
     list_length = len(listToSort)
@@ -45,11 +65,18 @@ location of the "sorted" portion of the list.
 
 INPUTS
 listToSort: an input list that may be sorted or unsorted
+key: a function of one argument used to extract a comparison key from each
+    element, called once per element (default = None, compare elements)
+reverse: set to True to sort in descending order (default = False)
 
 OUTPUTS
 listToSort: the input list sorted in place
 """
-def InsertionSort(listToSort):
+def InsertionSort(listToSort, key=None, reverse=False):
+    # Sort decorated copies of the elements if a key or reverse is given
+    if key is not None or reverse:
+        return sortByKey(InsertionSort, listToSort, key, reverse)
+
     # Calculate length of input list
     list_length = len(listToSort)
     
@@ -68,6 +95,62 @@ def InsertionSort(listToSort):
                 
     return listToSort
 
+"""
+BinaryInsertionSort
+
+This function sorts an input list in place like InsertionSort, but finds the
+correct location of each element in the "sorted" portion of the list with a
+binary search, and moves the larger elements up by one with a single slice
+assignment instead of one swap per element. It still moves O(n^2) elements
+in the worst case, but makes only O(n log n) comparisons, and the moves are
+done in C instead of Python. It is also the small-range kernel used by
+MergeSort, TimSort and QuickSort.
+
+INPUTS
+listToSort: an input list that may be sorted or unsorted
+key: a function of one argument used to extract a comparison key from each
+    element, called once per element (default = None, compare elements)
+reverse: set to True to sort in descending order (default = False)
+
+OUTPUTS
+listToSort: the input list sorted in place
+"""
+def BinaryInsertionSort(listToSort, key=None, reverse=False):
+    # Sort decorated copies of the elements if a key or reverse is given
+    if key is not None or reverse:
+        return sortByKey(BinaryInsertionSort, listToSort, key, reverse)
+
+    binaryInsertionSort(listToSort, 0, len(listToSort))
+    return listToSort
+
+"""
+binaryInsertionSort: this function sorts listToSort[lo:hi] in place given that
+listToSort[lo:start] is already sorted. Each insertion point is found with a
+binary search, and the larger elements are shifted with one slice assignment.
+Equal elements keep their order.
+
+INPUTS
+listToSort: the list being sorted
+lo:         the start index of the range to sort
+hi:         one past the last index of the range to sort
+start:      the first index that is not known to be sorted (defaults to lo)
+
+There is no explicit return value. listToSort[lo:hi] is sorted in place.
+"""
+def binaryInsertionSort(listToSort, lo, hi, start=None):
+    # Set default value for start if None.
+    if start is None or start == lo:
+        start = lo + 1
+
+    for idx in range(start, hi):
+        val = listToSort[idx]
+        # Insert after any equal elements to keep the sort stable
+        pos = bisect_right(listToSort, val, lo, idx)
+        if pos != idx:
+            listToSort[pos + 1:idx + 1] = listToSort[pos:idx]
+            listToSort[pos] = val
+    return
+
 """
 BubbleSort
 
@@ -77,12 +160,18 @@ element on the left.
 
 INPUTS
 listToSort: an input list that may be sorted or unsorted
+key: a function of one argument used to extract a comparison key from each
+    element, called once per element (default = None, compare elements)
+reverse: set to True to sort in descending order (default = False)
 
 OUTPUTS
 listToSort: the input list sorted in place
 """
-def BubbleSort(listToSort):
-    
+def BubbleSort(listToSort, key=None, reverse=False):
+    # Sort decorated copies of the elements if a key or reverse is given
+    if key is not None or reverse:
+        return sortByKey(BubbleSort, listToSort, key, reverse)
+
     # Calculate length of input list
     list_length = len(listToSort)
     
@@ -108,128 +197,2063 @@ def BubbleSort(listToSort):
 """
 MergeSort
 
-This function sorts an input list by recursively breaking the list in half,
-sorting each half, and then strategically merging the halves
-to create a sorted list. The sorting is not done in place, but the results
-are copied back to the input list.
+This function sorts an input list bottom-up: it first sorts blocks of
+INSERTION_CUTOFF elements with binary insertion sort, then merges neighboring
+blocks, then neighboring runs of twice that length, and so on until one run
+covers the whole list. Runs are merged by index into a single auxiliary
+buffer that is allocated once and reused for the whole sort, swapping the
+roles of the list and the buffer after every pass. No recursion is used, so
+large lists cannot hit the recursion limit. The merge is stable. If the last
+pass leaves the results in the buffer, they are copied back to the input
+list.
 
 INPUTS
 listToSort: an input list that may be sorted or unsorted
+key: a function of one argument used to extract a comparison key from each
+    element, called once per element (default = None, compare elements)
+reverse: set to True to sort in descending order (default = False)
 
 OUTPUTS
 listToSort: the input list, sorted
 """
-def MergeSort(listToSort):
+def MergeSort(listToSort, key=None, reverse=False):
+    # Sort decorated copies of the elements if a key or reverse is given
+    if key is not None or reverse:
+        return sortByKey(MergeSort, listToSort, key, reverse)
+
+    # Calculate length of input list
+    list_length = len(listToSort)
 
-    # Base case 1: If list has one element, return
-    if len(listToSort) == 1:
+    # Base case: If list has zero or one element, return
+    if list_length < 2:
         return listToSort
-    
-    # Base case 2: If list has two elements, swap elements if needed and then 
-    # return
-    if len(listToSort) == 2:
-        if listToSort[0] > listToSort[1]:
-            listToSort[0], listToSort[1] = listToSort[1], listToSort[0]
+
+    # Preallocate the one auxiliary buffer used for every merge. src holds the
+    # runs being merged and dst receives the merged runs. The buffer is made
+    # by slicing, so it has the same type as listToSort.
+    src = listToSort
+    dst = listToSort[:]
+
+    # Sort small blocks with binary insertion sort
+    width = INSERTION_CUTOFF
+    for lo in range(0, list_length, width):
+        binaryInsertionSort(listToSort, lo, min(lo + width, list_length))
+
+    # Double the run width on each pass until a single run remains
+    while width < list_length:
+        for lo in range(0, list_length, 2 * width):
+            mid = min(lo + width, list_length)
+            hi = min(lo + 2 * width, list_length)
+            mergeRuns(src, dst, lo, mid, hi)
+        # The merged runs become the input of the next pass
+        src, dst = dst, src
+        width *= 2
+
+    # Copy sorted values back to listToSort if they ended up in the buffer
+    if src is not listToSort:
+        listToSort[:] = src
+
+    return listToSort
+
+"""
+mergeRuns
+
+This function merges the two adjacent sorted runs src[lo:mid] and
+src[mid:hi] into dst[lo:hi] by walking an index through each run. Ties are
+taken from the left run so that the merge is stable.
+
+INPUTS
+src: the list holding the two sorted runs
+dst: the list to write the merged run into (same length as src)
+lo:  the start index of the left run
+mid: the end of the left run and start of the right run
+hi:  the end index of the right run
+
+There is no explicit return value. dst[lo:hi] is filled with the merged run.
+"""
+def mergeRuns(src, dst, lo, mid, hi):
+    i = lo
+    j = mid
+    k = lo
+
+    # Take the smaller front element until one of the runs is exhausted
+    while i < mid and j < hi:
+        if src[j] < src[i]:
+            dst[k] = src[j]
+            j += 1
+        else:
+            dst[k] = src[i]
+            i += 1
+        k += 1
+
+    # Copy whatever remains of the unfinished run with one slice assignment
+    if i < mid:
+        dst[k:hi] = src[i:mid]
+    else:
+        dst[k:hi] = src[j:hi]
+    return
+
+"""
+InPlaceMergeSort
+
+This function sorts an input list in place with a stable merge sort that
+needs only O(sqrt(n)) auxiliary memory, instead of the O(n) buffer of
+MergeSort. Like MergeSort, it sorts small blocks with binary insertion sort
+and then merges neighboring runs bottom-up, but each merge works with a
+buffer of at most b = max(INSERTION_CUTOFF, sqrt(n)) elements:
+    - if one of the two runs fits in the buffer, it is copied out and the
+      runs are merged directly;
+    - otherwise the longer run is cut in half, the matching cut in the other
+      run is found by binary search, the two middle pieces are swapped by a
+      rotation (which also moves at most b elements at a time), and the two
+      smaller merges that result are done the same way.
+All copies, including the temporary slices Python makes, hold at most b
+elements. The recursion depth is O(log n). The cost is O(n log n)
+comparisons, but O(n log^2 n) element moves in the worst case.
+
+INPUTS
+listToSort: an input list that may be sorted or unsorted
+
+OUTPUTS
+listToSort: the input list sorted in place
+"""
+def InPlaceMergeSort(listToSort):
+    # Calculate length of input list
+    list_length = len(listToSort)
+
+    # Base case: If list has zero or one element, return
+    if list_length < 2:
         return listToSort
-    
-    # Recursively call MergeSort to sort each half
-    k = len(listToSort) // 2
-    left_half = MergeSort(listToSort[:k])
-    right_half = MergeSort(listToSort[k:])
-    
-    # Merge sorted halves
-    sorted_array = []
-    while len(left_half) > 0 or len(right_half) > 0:
-        if len(left_half) == 0:
-            sorted_array.append(right_half.pop(0))
-        elif len(right_half) == 0:
-            sorted_array.append(left_half.pop(0))
+
+    # Size of the largest block ever copied out of the list
+    buf_size = max(INSERTION_CUTOFF, isqrt(list_length))
+
+    # Sort small blocks with binary insertion sort
+    width = INSERTION_CUTOFF
+    for lo in range(0, list_length, width):
+        binaryInsertionSort(listToSort, lo, min(lo + width, list_length))
+
+    # Double the run width on each pass until a single run remains
+    while width < list_length:
+        for lo in range(0, list_length - width, 2 * width):
+            mergeInPlace(listToSort, lo, lo + width, \
+                         min(lo + 2 * width, list_length), buf_size)
+        width *= 2
+
+    return listToSort
+
+"""
+InPlaceMergeSort helper functions:
+    mergeInPlace
+    rotate
+    swapBlocks
+    moveBlock
+"""
+
+"""
+mergeInPlace: this function stably merges the adjacent sorted runs
+listToSort[lo:mid] and listToSort[mid:hi], copying at most buf_size
+elements at a time.
+
+INPUTS
+listToSort: the list being sorted
+lo:         the start index of the left run
+mid:        the end of the left run and start of the right run
+hi:         the end index of the right run
+buf_size:   the largest number of elements to copy at once
+
+There is no explicit return value. listToSort[lo:hi] is merged in place.
+"""
+def mergeInPlace(listToSort, lo, mid, hi, buf_size):
+    while lo < mid and mid < hi:
+        # Already in order: nothing to do
+        if not listToSort[mid] < listToSort[mid - 1]:
+            return
+
+        len1 = mid - lo
+        len2 = hi - mid
+        if len1 <= buf_size:
+            # Copy the left run out and merge forwards
+            tmp = listToSort[lo:mid]
+            i = 0
+            j = mid
+            k = lo
+            while i < len1 and j < hi:
+                if listToSort[j] < tmp[i]:
+                    listToSort[k] = listToSort[j]
+                    j += 1
+                else:
+                    listToSort[k] = tmp[i]
+                    i += 1
+                k += 1
+            listToSort[k:k + len1 - i] = tmp[i:]
+            return
+
+        if len2 <= buf_size:
+            # Copy the right run out and merge backwards
+            tmp = listToSort[mid:hi]
+            i = mid - 1
+            j = len2 - 1
+            k = hi - 1
+            while i >= lo and j >= 0:
+                if tmp[j] < listToSort[i]:
+                    listToSort[k] = listToSort[i]
+                    i -= 1
+                else:
+                    listToSort[k] = tmp[j]
+                    j -= 1
+                k -= 1
+            listToSort[lo:lo + j + 1] = tmp[:j + 1]
+            return
+
+        # Cut the longer run in half and find the matching cut in the other.
+        # Equal values from the left run stay before those from the right.
+        if len1 > len2:
+            cut1 = lo + len1 // 2
+            cut2 = bisect_left(listToSort, listToSort[cut1], mid, hi)
         else:
-            if left_half[0] < right_half[0]:
-                sorted_array.append(left_half.pop(0))
-            else:
-                sorted_array.append(right_half.pop(0))
-    
-    # Copy sorted array values to listToSort
-    listToSort[:] = sorted_array.copy()
+            cut2 = mid + len2 // 2
+            cut1 = bisect_right(listToSort, listToSort[cut2], lo, mid)
+
+        # Swap the middle pieces so both halves can be merged separately
+        rotate(listToSort, cut1, mid, cut2, buf_size)
+        new_mid = cut1 + (cut2 - mid)
+
+        # Recurse on the smaller merge and loop on the larger one
+        if new_mid - lo < hi - new_mid:
+            mergeInPlace(listToSort, lo, cut1, new_mid, buf_size)
+            lo, mid = new_mid, cut2
+        else:
+            mergeInPlace(listToSort, new_mid, cut2, hi, buf_size)
+            mid, hi = cut1, new_mid
+    return
+
+"""
+rotate: this function swaps the adjacent blocks listToSort[lo:mid] and
+listToSort[mid:hi], copying at most buf_size elements at a time. If one
+block fits in buf_size, it is copied out while the other block slides over.
+Otherwise equal-sized blocks are swapped (Gries-Mills) until one fits.
+
+INPUTS
+listToSort: the list holding the blocks
+lo:         the start index of the first block
+mid:        the end of the first block and start of the second
+hi:         the end index of the second block
+buf_size:   the largest number of elements to copy at once
+
+There is no explicit return value.
+"""
+def rotate(listToSort, lo, mid, hi, buf_size):
+    while lo < mid and mid < hi:
+        len1 = mid - lo
+        len2 = hi - mid
+        if len1 <= buf_size:
+            tmp = listToSort[lo:mid]
+            moveBlock(listToSort, mid, lo, len2, buf_size)
+            listToSort[hi - len1:hi] = tmp
+            return
+        if len2 <= buf_size:
+            tmp = listToSort[mid:hi]
+            moveBlock(listToSort, lo, lo + len2, len1, buf_size)
+            listToSort[lo:lo + len2] = tmp
+            return
+
+        if len1 <= len2:
+            # [A B0 B1] -> [B0 A B1]: B0 is in place, rotate [A B1]
+            swapBlocks(listToSort, lo, mid, len1, buf_size)
+            lo += len1
+            mid += len1
+        else:
+            # [A0 A1 B] -> [A0 B A1]: A1 is in place, rotate [A0 B]
+            swapBlocks(listToSort, mid - len2, mid, len2, buf_size)
+            mid -= len2
+            hi -= len2
+    return
+
+"""
+swapBlocks: this function swaps the non-overlapping blocks
+listToSort[i:i+m] and listToSort[j:j+m], at most buf_size elements at a time.
+"""
+def swapBlocks(listToSort, i, j, m, buf_size):
+    for off in range(0, m, buf_size):
+        c = min(buf_size, m - off)
+        tmp = listToSort[i + off:i + off + c]
+        listToSort[i + off:i + off + c] = listToSort[j + off:j + off + c]
+        listToSort[j + off:j + off + c] = tmp
+    return
+
+"""
+moveBlock: this function copies listToSort[src:src+m] to listToSort[dst:dst+m],
+at most buf_size elements at a time. The blocks may overlap.
+"""
+def moveBlock(listToSort, src, dst, m, buf_size):
+    if dst < src:
+        # Moving left: copy the front first
+        for off in range(0, m, buf_size):
+            c = min(buf_size, m - off)
+            listToSort[dst + off:dst + off + c] = \
+            listToSort[src + off:src + off + c]
+    else:
+        # Moving right: copy the back first
+        for end in range(m, 0, -buf_size):
+            c = min(buf_size, end)
+            listToSort[dst + end - c:dst + end] = \
+            listToSort[src + end - c:src + end]
+    return
+
+"""
+sortByKey
+
+This function implements the key and reverse options of the sorts above with
+a decorate-sort-undecorate pass. Each element of listToSort[lo:hi] is
+replaced by the pair (key(element), index), so key is called exactly once per
+element and the sort only ever compares keys (and then indices, which never
+tie). The pairs are sorted with alg, and the elements are then placed in the
+order given by the sorted indices.
+
+Because the index breaks ties between equal keys, equal elements keep their
+original order, whatever alg is. For reverse=True, the negated index is used
+and the sorted pairs are reversed, which also keeps equal elements in their
+original order.
+
+With keysOnly=True, alg sorts the bare keys instead, so equal keys compare
+equal and modes such as QuickSort's threeWay can group them. One pass over
+the sorted keys then records where the run of each key starts, and each
+element is placed in the run of its key, in its original order, so the
+result is still stable. This needs hashable keys; otherwise the (key, index)
+pairs are sorted as above.
+
+INPUTS
+alg:        the sorting function to apply to the decorated pairs
+listToSort: an input list that may be sorted or unsorted
+key:        a function of one argument, or None to use the elements as keys
+reverse:    set to True to sort in descending order
+lo:         the first index of the range to sort (default = 0)
+hi:         one past the last index of the range to sort
+            (default = None, which means len(listToSort))
+keysOnly:   set to True to sort the bare keys instead of (key, index)
+            pairs (default = False)
+**kwargs:   any extra options to pass on to alg
+
+OUTPUTS
+listToSort: the input list, sorted
+"""
+def sortByKey(alg, listToSort, key, reverse, lo=0, hi=None, keysOnly=False, \
+              **kwargs):
+    # Set default value for hi if None.
+    if hi is None:
+        hi = len(listToSort)
+    values = listToSort[lo:hi]
+
+    # Decorate: compute every key once
+    keys = values if key is None else [key(x) for x in values]
+    if keysOnly and placeByKeys(alg, listToSort, keys, values, reverse, lo, \
+                                **kwargs) is not None:
+        return listToSort
+    if reverse:
+        decorated = list(zip(keys, range(0, -len(values), -1)))
+    else:
+        decorated = list(zip(keys, range(len(values))))
+
+    # Sort the decorated pairs
+    alg(decorated, **kwargs)
+    if reverse:
+        decorated.reverse()
+
+    # Undecorate: put the elements in the sorted order of their indices
+    if reverse:
+        listToSort[lo:hi] = [values[-idx] for k, idx in decorated]
+    else:
+        listToSort[lo:hi] = [values[idx] for k, idx in decorated]
+
+    return listToSort
+
+"""
+placeByKeys: this function sorts a copy of keys with alg, then writes each
+element of values into listToSort[lo:lo + len(values)] within the run of its
+key in the sorted keys, in its original order among equal keys. The run
+starts are found in one pass over the sorted keys, so placing the elements
+takes linear time.
+
+INPUTS
+alg:        the sorting function to apply to the keys
+listToSort: the list to write the elements into
+keys:       the key of each element of values
+values:     the elements to place
+reverse:    set to True to place the elements in descending order
+lo:         the index of listToSort to start writing at
+**kwargs:   any extra options to pass on to alg
+
+OUTPUTS
+listToSort: the input list, sorted, or None (with listToSort unchanged) if
+            the keys are not hashable
+"""
+def placeByKeys(alg, listToSort, keys, values, reverse, lo, **kwargs):
+    sortedKeys = list(keys)
+    alg(sortedKeys, **kwargs)
+    if reverse:
+        sortedKeys.reverse()
+
+    # Map each key to the start of its run: going backwards, the first slot
+    # of a run is the last one stored
+    m = len(sortedKeys)
+    try:
+        nextSlot = dict(zip(reversed(sortedKeys), range(m - 1, -1, -1)))
+    except TypeError:
+        return None
+
+    # Each run of equal keys is filled from its first slot onwards
+    for k, x in zip(keys, values):
+        slot = nextSlot[k]
+        nextSlot[k] = slot + 1
+        listToSort[lo + slot] = x
+    return listToSort
+
+"""
+TimSort
+
+This function sorts an input list in place with an adaptive, stable merge
+sort in the style of Timsort. It scans the list for natural runs that are
+already ascending (or strictly descending, which are reversed in place),
+extends short runs to a minimum length with binary insertion sort, and
+pushes the runs onto a stack whose lengths are kept balanced by merging.
+Merges trim the parts of each run that are already in place and switch into
+galloping mode when one run keeps winning, so presorted input or input made
+of a few concatenated sorted batches takes linear time, while random input
+remains O(n log n).
+
+INPUTS
+listToSort: an input list that may be sorted or unsorted
+
+OUTPUTS
+listToSort: the input list sorted in place
+"""
+def TimSort(listToSort):
+    # Calculate length of input list
+    list_length = len(listToSort)
+
+    # Base case: If list has zero or one element, return
+    if list_length < 2:
+        return listToSort
+
+    # Short runs are extended to at least min_run elements
+    min_run = computeMinRun(list_length)
+
+    # Stack of pending runs, each stored as [start index, length], and the
+    # adaptive galloping threshold shared by all merges
+    runs = []
+    min_gallop = MIN_GALLOP
+
+    lo = 0
+    while lo < list_length:
+        # Find the next natural run and extend it if it is too short
+        run_length = countRunAndMakeAscending(listToSort, lo, list_length)
+        if run_length < min_run:
+            forced = min(min_run, list_length - lo)
+            binaryInsertionSort(listToSort, lo, lo + forced, lo + run_length)
+            run_length = forced
+
+        # Push the run and merge until the stack invariants hold again
+        runs.append([lo, run_length])
+        min_gallop = mergeCollapse(listToSort, runs, min_gallop)
+        lo += run_length
+
+    # Merge all remaining runs into one
+    while len(runs) > 1:
+        n = len(runs) - 2
+        if n > 0 and runs[n - 1][1] < runs[n + 1][1]:
+            n -= 1
+        min_gallop = mergeAt(listToSort, runs, n, min_gallop)
 
     return listToSort
 
+"""
+TimSort helper functions:
+    computeMinRun
+    countRunAndMakeAscending
+    mergeCollapse
+    mergeAt
+    gallopLeft
+    gallopRight
+    mergeLo
+    mergeHi
+
+These functions operate directly on the list being sorted.
+"""
+
+# Initial number of consecutive wins by one run before galloping starts.
+MIN_GALLOP = 7
+
+"""
+computeMinRun: this function returns the minimum run length for a list of
+length n. The result is n itself for n < 64, and otherwise lies in [32, 64]
+so that n / min_run is equal to, or slightly less than, a power of two.
+
+INPUTS
+n: the length of the list to sort
+
+OUTPUTS
+min_run: the minimum run length
+"""
+def computeMinRun(n):
+    # Becomes 1 if any bit shifted off is set
+    r = 0
+    while n >= 64:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+"""
+countRunAndMakeAscending: this function returns the length of the natural run
+that starts at index lo. A run is either non-descending or strictly
+descending. Descending runs are reversed in place, which keeps the sort
+stable because their elements are all distinct.
+
+INPUTS
+listToSort: the list being sorted
+lo:         the start index of the run
+hi:         one past the last index that may belong to the run
+
+OUTPUTS
+run_length: the length of the run starting at lo
+"""
+def countRunAndMakeAscending(listToSort, lo, hi):
+    r = lo + 1
+    if r == hi:
+        return 1
+
+    if listToSort[r] < listToSort[lo]:
+        # Strictly descending run: find its end and reverse it
+        r += 1
+        while r < hi and listToSort[r] < listToSort[r - 1]:
+            r += 1
+        listToSort[lo:r] = listToSort[lo:r][::-1]
+    else:
+        # Non-descending run: find its end
+        r += 1
+        while r < hi and not listToSort[r] < listToSort[r - 1]:
+            r += 1
+
+    return r - lo
+
+"""
+mergeCollapse: this function merges runs on the top of the stack until, for
+the lengths A, B, C, D of the top four runs (D on top), both B > C + D and
+C > D hold, and also A > B + C. This keeps the run lengths growing at least
+as fast as the Fibonacci numbers, so the stack stays logarithmic in size and
+merges stay balanced.
+
+INPUTS
+listToSort: the list being sorted
+runs:       the stack of pending runs, as [start index, length] pairs
+min_gallop: the current galloping threshold
+
+OUTPUTS
+min_gallop: the updated galloping threshold
+"""
+def mergeCollapse(listToSort, runs, min_gallop):
+    while len(runs) > 1:
+        n = len(runs) - 2
+        if (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or \
+           (n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]):
+            # Merge the middle run with the smaller of its neighbors
+            if runs[n - 1][1] < runs[n + 1][1]:
+                n -= 1
+        elif runs[n][1] > runs[n + 1][1]:
+            break
+        min_gallop = mergeAt(listToSort, runs, n, min_gallop)
+    return min_gallop
+
+"""
+mergeAt: this function merges the runs at stack indices n and n + 1. Elements
+of the first run that are not larger than the start of the second run are
+already in place, as are elements of the second run that are not smaller
+than the end of the first run, so only the remaining middle parts are merged.
+
+INPUTS
+listToSort: the list being sorted
+runs:       the stack of pending runs, as [start index, length] pairs
+n:          the stack index of the first of the two runs to merge
+min_gallop: the current galloping threshold
+
+OUTPUTS
+min_gallop: the updated galloping threshold
+"""
+def mergeAt(listToSort, runs, n, min_gallop):
+    base1, len1 = runs[n]
+    base2, len2 = runs[n + 1]
+
+    # Record the combined run and remove the second run from the stack
+    runs[n][1] = len1 + len2
+    del runs[n + 1]
+
+    # Skip elements of the first run that are already in place
+    k = gallopRight(listToSort[base2], listToSort, base1, base1 + len1)
+    len1 -= k - base1
+    base1 = k
+    if len1 == 0:
+        return min_gallop
+
+    # Skip elements of the second run that are already in place
+    len2 = gallopLeft(listToSort[base1 + len1 - 1], listToSort, \
+                      base2, base2 + len2, True) - base2
+    if len2 == 0:
+        return min_gallop
+
+    # Merge from the side of the shorter run so the temporary copy is small
+    if len1 <= len2:
+        return mergeLo(listToSort, base1, len1, base2, len2, min_gallop)
+    else:
+        return mergeHi(listToSort, base1, len1, base2, len2, min_gallop)
+
+"""
+gallopLeft: this function returns the leftmost index in the sorted range
+listToSort[lo:hi] where key could be inserted. It probes exponentially
+growing offsets from one end of the range before finishing with a binary
+search, so it costs O(log d) comparisons when the answer is d positions
+from that end.
+
+INPUTS
+key:        the value to locate
+listToSort: the list holding the sorted range
+lo:         the start index of the range
+hi:         one past the last index of the range
+fromRight:  set to True to start probing at the right end of the range
+    (default = False)
+
+OUTPUTS
+the first index i in [lo, hi] with listToSort[i] >= key (or hi)
+"""
+def gallopLeft(key, listToSort, lo, hi, fromRight=False):
+    ofs = 1
+    if fromRight:
+        last = hi
+        while hi - ofs >= lo and not listToSort[hi - ofs] < key:
+            last = hi - ofs
+            ofs *= 2
+        return bisect_left(listToSort, key, max(hi - ofs + 1, lo), last)
+    else:
+        last = lo
+        while lo + ofs <= hi and listToSort[lo + ofs - 1] < key:
+            last = lo + ofs
+            ofs *= 2
+        return bisect_left(listToSort, key, last, min(lo + ofs - 1, hi))
+
+"""
+gallopRight: this function is like gallopLeft, but returns the rightmost
+index where key could be inserted, i.e. after any elements equal to key.
+
+INPUTS
+key:        the value to locate
+listToSort: the list holding the sorted range
+lo:         the start index of the range
+hi:         one past the last index of the range
+fromRight:  set to True to start probing at the right end of the range
+    (default = False)
+
+OUTPUTS
+the first index i in [lo, hi] with listToSort[i] > key (or hi)
+"""
+def gallopRight(key, listToSort, lo, hi, fromRight=False):
+    ofs = 1
+    if fromRight:
+        last = hi
+        while hi - ofs >= lo and key < listToSort[hi - ofs]:
+            last = hi - ofs
+            ofs *= 2
+        return bisect_right(listToSort, key, max(hi - ofs + 1, lo), last)
+    else:
+        last = lo
+        while lo + ofs <= hi and not key < listToSort[lo + ofs - 1]:
+            last = lo + ofs
+            ofs *= 2
+        return bisect_right(listToSort, key, last, min(lo + ofs - 1, hi))
+
+"""
+mergeLo: this function merges the adjacent runs listToSort[base1:base1+len1]
+and listToSort[base2:base2+len2] from left to right, where len1 <= len2.
+The first run is copied to a temporary list and the merged output is written
+over both runs. When one run wins min_gallop times in a row, the merge
+switches to galloping mode and moves whole blocks with slice assignments.
+The threshold shrinks while galloping pays off and grows when it does not.
+
+INPUTS
+listToSort: the list being sorted
+base1:      the start index of the first run
+len1:       the length of the first run
+base2:      the start index of the second run (base1 + len1)
+len2:       the length of the second run
+min_gallop: the current galloping threshold
+
+OUTPUTS
+min_gallop: the updated galloping threshold
+"""
+def mergeLo(listToSort, base1, len1, base2, len2, min_gallop):
+    tmp = listToSort[base1:base1 + len1]
+    i = 0              # Next element of the first run (in tmp)
+    j = base2          # Next element of the second run
+    end2 = base2 + len2
+    k = base1          # Next output position
+
+    while i < len1 and j < end2:
+        # Merge one element at a time until one run keeps winning
+        count1 = 0
+        count2 = 0
+        while i < len1 and j < end2:
+            if listToSort[j] < tmp[i]:
+                listToSort[k] = listToSort[j]
+                j += 1
+                count2 += 1
+                count1 = 0
+            else:
+                listToSort[k] = tmp[i]
+                i += 1
+                count1 += 1
+                count2 = 0
+            k += 1
+            if count1 >= min_gallop or count2 >= min_gallop:
+                break
+
+        # Gallop while whole blocks can be moved at once
+        while i < len1 and j < end2:
+            # Elements of the first run that are <= the next second-run element
+            count1 = gallopRight(listToSort[j], tmp, i, len1) - i
+            listToSort[k:k + count1] = tmp[i:i + count1]
+            k += count1
+            i += count1
+            if i == len1:
+                break
+
+            # Elements of the second run that are < the next first-run element
+            count2 = gallopLeft(tmp[i], listToSort, j, end2) - j
+            listToSort[k:k + count2] = listToSort[j:j + count2]
+            k += count2
+            j += count2
+
+            # Leave galloping mode if it stopped paying off
+            if count1 < MIN_GALLOP and count2 < MIN_GALLOP:
+                min_gallop += 1
+                break
+            min_gallop = max(1, min_gallop - 1)
+
+    # The rest of the second run is already in place; copy the rest of tmp
+    listToSort[k:k + len1 - i] = tmp[i:]
+    return min_gallop
+
+"""
+mergeHi: this function is the mirror image of mergeLo for len1 > len2. The
+second run is copied to a temporary list and the runs are merged from right
+to left, writing the largest remaining element to the end each time.
+
+INPUTS
+listToSort: the list being sorted
+base1:      the start index of the first run
+len1:       the length of the first run
+base2:      the start index of the second run (base1 + len1)
+len2:       the length of the second run
+min_gallop: the current galloping threshold
+
+OUTPUTS
+min_gallop: the updated galloping threshold
+"""
+def mergeHi(listToSort, base1, len1, base2, len2, min_gallop):
+    tmp = listToSort[base2:base2 + len2]
+    i = base1 + len1 - 1   # Last remaining element of the first run
+    j = len2 - 1           # Last remaining element of the second run (in tmp)
+    k = base2 + len2 - 1   # Next output position
+
+    while i >= base1 and j >= 0:
+        # Merge one element at a time until one run keeps winning
+        count1 = 0
+        count2 = 0
+        while i >= base1 and j >= 0:
+            if tmp[j] < listToSort[i]:
+                listToSort[k] = listToSort[i]
+                i -= 1
+                count1 += 1
+                count2 = 0
+            else:
+                listToSort[k] = tmp[j]
+                j -= 1
+                count2 += 1
+                count1 = 0
+            k -= 1
+            if count1 >= min_gallop or count2 >= min_gallop:
+                break
+
+        # Gallop while whole blocks can be moved at once
+        while i >= base1 and j >= 0:
+            # Elements of the first run that are > the last second-run element
+            p = gallopRight(tmp[j], listToSort, base1, i + 1, True)
+            count1 = i + 1 - p
+            listToSort[k - count1 + 1:k + 1] = listToSort[p:i + 1]
+            k -= count1
+            i = p - 1
+            if i < base1:
+                break
+
+            # Elements of the second run that are >= the last first-run element
+            p = gallopLeft(listToSort[i], tmp, 0, j + 1, True)
+            count2 = j + 1 - p
+            listToSort[k - count2 + 1:k + 1] = tmp[p:j + 1]
+            k -= count2
+            j = p - 1
+
+            # Leave galloping mode if it stopped paying off
+            if count1 < MIN_GALLOP and count2 < MIN_GALLOP:
+                min_gallop += 1
+                break
+            min_gallop = max(1, min_gallop - 1)
+
+    # The rest of the first run is already in place; copy the rest of tmp
+    listToSort[base1:base1 + j + 1] = tmp[:j + 1]
+    return min_gallop
+
 """
 QuickSort
 
-This function sorts an input list by (1) choosing a pivot value, (2)
-partitioning the list into values less than the pivot value vs. greater
-than or equal to the pivot value, (3) recursively sorting both parts of 
-the list. Sort a list with the call QuickSort(listToSort), 
-or additionally specify i and j.
+This function sorts an input list in place with an introspective quick sort.
+It (1) chooses a pivot value with a median-of-three, or for larger ranges a
+ninther (median of three medians-of-three), (2) partitions the range into
+values less than or equal to the pivot and values greater than or equal to
+the pivot, and (3) recursively sorts only the smaller part while looping on
+the larger part, so the recursion depth stays below log2(n). If partitioning
+goes more than 2*log2(n) levels deep, the remaining range is heap sorted
+(see HeapSort), which bounds the worst case at O(n log n). Small ranges are
+finished with insertion sort. Sort a list with the call
+QuickSort(listToSort), or additionally specify i and j.
+
+With threeWay=True, each range is instead split into values less than, equal
+to, and greater than the pivot, and the values equal to the pivot are left
+out of both recursive calls. Inputs with only k distinct values then sort in
+O(n log k), at the cost of extra swaps when all values are distinct.
 
 INPUTS
 listToSort: an input list that may be sorted or unsorted
+i: the first index of the range to sort (default = 0)
+j: one past the last index of the range to sort (default = len(listToSort))
+threeWay: set to True to use three-way partitioning (default = False)
+key: a function of one argument used to extract a comparison key from each
+    element, called once per element (default = None, compare elements)
+reverse: set to True to sort in descending order (default = False)
 
 OUTPUTS
 listToSort: the input list sorted in place
 """
-def QuickSort(listToSort, i=0, j=None):
+def QuickSort(listToSort, i=0, j=None, threeWay=False, key=None, \
+              reverse=False):
     # Set default value for j if None.
     if j == None:
         j = len(listToSort)
-        
-    # Base case 1: If list has zero or one element, return
-    if i == j - 1 or i == j:
-        return listToSort
-    
-    # Base case 2: If list has two elements, swap elements if 
-    # needed and then return
-    if i == j - 2:
-        if listToSort[i] > listToSort[j - 1]:
-            listToSort[i], listToSort[j - 1] = listToSort[j - 1], listToSort[i]
+
+    # Sort decorated copies of the elements if a key or reverse is given
+    if key is not None or reverse:
+        return sortByKey(QuickSort, listToSort, key, reverse, i, j, \
+                         keysOnly=threeWay, threeWay=threeWay)
+
+    # Base case: If range has zero or one element, return
+    if j - i < 2:
         return listToSort
-    
-    # Save values of i and j prior to partitioning
-    a = i
-    b = j
-    
-    # Choose partition value. For simplicity, I'll choose the middle index
-    pivot = (i + j - 1) // 2
-    pivot_val = listToSort[pivot]
-    
-    # Partition until i >= j - 1. i can only moved to the right when 
-    # listToSort[i] < pivot_val. j can only move to the left when 
-    # listToSort[j] > pivot_val 
-    while i < j - 1:
-        if listToSort[i] < pivot_val:
-            i += 1
-        elif listToSort[j - 1] > pivot_val:
-            j -= 1
-        # Switch elements if both i and j are stuck with special case for 
-        # both being stuck on pivot value
-        else:
-            if listToSort[i] == pivot_val and listToSort[j - 1] == pivot_val:
-                i += 1
-                pivot = j - 1
-            else:
-                listToSort[i], listToSort[j - 1] = listToSort[j - 1], \
-                listToSort[i]
-                # Keep track of pivot location if elements are swapped
-                if i == pivot:
-                    pivot = j - 1
-                elif j - 1 == pivot:
-                    pivot = i    
-    
-    # Recursively sort both parts of list
-    QuickSort(listToSort, i=a, j=pivot)
-    QuickSort(listToSort, i=pivot, j=b)
-    
+
+    # Allow 2*floor(log2(n)) levels of partitioning before heap sorting
+    depth_limit = 2 * ((j - i).bit_length() - 1)
+    introSort(listToSort, i, j, depth_limit, threeWay)
+
     return listToSort
 
 """
-Importing the testing code after function defs to ensure same references.
-"""
-from project1tests import *
+QuickSort helper functions:
+    introSort
+    choosePivot
+    medianOfThree
+    partition
+    partition3
 
+These functions operate directly on the list being sorted.
 """
-Main function.
+
+# Ranges with more than this many elements use a ninther pivot.
+NINTHER_CUTOFF = 40
+
+"""
+introSort: this function sorts listToSort[lo:hi] in place. It partitions the
+range, recurses into the smaller part and loops on the larger part, and
+falls back to heap sort once depth_limit partitioning levels are used up.
+
+INPUTS
+listToSort:  the list being sorted
+lo:          the first index of the range to sort
+hi:          one past the last index of the range to sort
+depth_limit: the number of partitioning levels left before heap sorting
+threeWay:    set to True to use three-way partitioning (default = False)
+
+There is no explicit return value. listToSort[lo:hi] is sorted in place.
+"""
+def introSort(listToSort, lo, hi, depth_limit, threeWay=False):
+    while hi - lo > INSERTION_CUTOFF:
+        # Too many levels: the pivots are bad, so switch to heap sort
+        if depth_limit == 0:
+            heapSortRange(listToSort, lo, hi)
+            return
+        depth_limit -= 1
+
+        # Partition so that listToSort[lt:gt] holds the pivot value(s)
+        p = choosePivot(listToSort, lo, hi)
+        if threeWay:
+            lt, gt = partition3(listToSort, lo, hi, p)
+        else:
+            lt = partition(listToSort, lo, hi, p)
+            gt = lt + 1
+
+        # Recurse on the smaller part only
+        if lt - lo < hi - gt:
+            introSort(listToSort, lo, lt, depth_limit, threeWay)
+            lo = gt
+        else:
+            introSort(listToSort, gt, hi, depth_limit, threeWay)
+            hi = lt
+
+    # Finish small ranges with insertion sort
+    binaryInsertionSort(listToSort, lo, hi)
+    return
+
+"""
+choosePivot: this function returns the index of a pivot for listToSort[lo:hi].
+It uses the median of the first, middle and last elements, or for ranges
+longer than NINTHER_CUTOFF the median of three such medians taken from evenly
+spaced positions (Tukey's ninther).
+
+INPUTS
+listToSort: the list being sorted
+lo:         the first index of the range
+hi:         one past the last index of the range
+
+OUTPUTS
+the index of the chosen pivot
+"""
+def choosePivot(listToSort, lo, hi):
+    last = hi - 1
+    mid = (lo + last) // 2
+    if hi - lo > NINTHER_CUTOFF:
+        step = (hi - lo) // 8
+        lo = medianOfThree(listToSort, lo, lo + step, lo + 2 * step)
+        mid = medianOfThree(listToSort, mid - step, mid, mid + step)
+        last = medianOfThree(listToSort, last - 2 * step, last - step, last)
+    return medianOfThree(listToSort, lo, mid, last)
+
+"""
+medianOfThree: this function returns whichever of the indices a, b and c holds
+the median of the three values.
+
+INPUTS
+listToSort: the list being sorted
+a, b, c:    three indices into listToSort
+
+OUTPUTS
+the index holding the median value
+"""
+def medianOfThree(listToSort, a, b, c):
+    if listToSort[a] < listToSort[b]:
+        if listToSort[b] < listToSort[c]:
+            return b
+        return c if listToSort[a] < listToSort[c] else a
+    else:
+        if listToSort[a] < listToSort[c]:
+            return a
+        return c if listToSort[b] < listToSort[c] else b
+
+"""
+partition: this function partitions listToSort[lo:hi] around the value at
+index p. The pivot is moved to the front, then i scans right past values less
+than the pivot and j scans left past values greater than the pivot, and the
+two stuck values are swapped. Both scans stop on values equal to the pivot,
+which splits runs of duplicates evenly. Finally the pivot is swapped into
+place.
+
+INPUTS
+listToSort: the list being sorted
+lo:         the first index of the range
+hi:         one past the last index of the range
+p:          the index of the pivot
+
+OUTPUTS
+the final index k of the pivot, with listToSort[lo:k] <= listToSort[k] and
+listToSort[k+1:hi] >= listToSort[k]
+"""
+def partition(listToSort, lo, hi, p):
+    listToSort[lo], listToSort[p] = listToSort[p], listToSort[lo]
+    pivot_val = listToSort[lo]
+    i = lo
+    j = hi
+    while True:
+        i += 1
+        while i < hi and listToSort[i] < pivot_val:
+            i += 1
+        j -= 1
+        # listToSort[lo] is the pivot, so this scan stops there at the latest
+        while pivot_val < listToSort[j]:
+            j -= 1
+        if i >= j:
+            break
+        listToSort[i], listToSort[j] = listToSort[j], listToSort[i]
+
+    # Move the pivot between the two parts
+    listToSort[lo], listToSort[j] = listToSort[j], listToSort[lo]
+    return j
+
+"""
+partition3: this function partitions listToSort[lo:hi] around the value at
+index p into three parts (Dijkstra's Dutch national flag). Values less than
+the pivot are swapped to the front, values greater than the pivot are swapped
+to the back, and values equal to the pivot are left in the middle.
+
+INPUTS
+listToSort: the list being sorted
+lo:         the first index of the range
+hi:         one past the last index of the range
+p:          the index of the pivot
+
+OUTPUTS
+lt, gt: indices such that listToSort[lo:lt] < pivot, listToSort[lt:gt] equals
+        the pivot, and listToSort[gt:hi] > pivot
+"""
+def partition3(listToSort, lo, hi, p):
+    pivot_val = listToSort[p]
+    lt = lo
+    i = lo
+    gt = hi
+
+    # [lo:lt] < pivot, [lt:i] == pivot, [i:gt] unseen, [gt:hi] > pivot
+    while i < gt:
+        if listToSort[i] < pivot_val:
+            listToSort[lt], listToSort[i] = listToSort[i], listToSort[lt]
+            lt += 1
+            i += 1
+        elif pivot_val < listToSort[i]:
+            gt -= 1
+            listToSort[gt], listToSort[i] = listToSort[i], listToSort[gt]
+        else:
+            i += 1
+
+    return lt, gt
+
+"""
+HeapSort
+
+This function sorts an input list in place with a bottom-up heap sort. It is
+the only sort here that is both in place (O(1) extra memory) and O(n log n)
+in the worst case, and it is the fallback that bounds the worst case of
+QuickSort. The max-heap is built bottom-up in O(n). Then the maximum is
+repeatedly swapped to the end of the range, and the value that took its
+place is put back with Floyd's trick: the hole at the root is first moved
+down to a leaf along the path of larger children, using one comparison per
+level, and the value is then sifted back up from there. The value came from
+the bottom of the heap, so it rarely moves up more than a level or two. This
+takes about n log2(n) comparisons instead of the 2 n log2(n) of a standard
+sift down. Heap sort is not stable.
+
+INPUTS
+listToSort: an input list that may be sorted or unsorted
+i: the first index of the range to sort (default = 0)
+j: one past the last index of the range to sort (default = len(listToSort))
+key: a function of one argument used to extract a comparison key from each
+    element, called once per element (default = None, compare elements)
+reverse: set to True to sort in descending order (default = False)
+
+OUTPUTS
+listToSort: the input list sorted in place
+"""
+def HeapSort(listToSort, i=0, j=None, key=None, reverse=False):
+    # Set default value for j if None.
+    if j == None:
+        j = len(listToSort)
+
+    # Sort decorated copies of the elements if a key or reverse is given
+    if key is not None or reverse:
+        return sortByKey(HeapSort, listToSort, key, reverse, i, j)
+
+    heapSortRange(listToSort, i, j)
+    return listToSort
+
+"""
+HeapSort helper functions:
+    heapSortRange
+    siftDown
+    siftFromLeaf
+
+The heap is stored in listToSort[lo:lo+n], with the children of position k
+at 2k+1 and 2k+2.
+"""
+
+"""
+heapSortRange: this function heap sorts listToSort[lo:hi] in place.
+
+INPUTS
+listToSort: the list being sorted
+lo:         the first index of the range
+hi:         one past the last index of the range
+
+There is no explicit return value. listToSort[lo:hi] is sorted in place.
+"""
+def heapSortRange(listToSort, lo, hi):
+    n = hi - lo
+
+    # Build a max-heap from the bottom up
+    for root in reversed(range(n // 2)):
+        siftDown(listToSort, lo, root, n)
+
+    # Repeatedly move the maximum to the end and refill the root's place
+    for end in reversed(range(1, n)):
+        val = listToSort[lo + end]
+        listToSort[lo + end] = listToSort[lo]
+        siftFromLeaf(listToSort, lo, val, end)
+    return
+
+"""
+siftDown: this function moves the value at heap position root down until
+both of its children are no larger.
+
+INPUTS
+listToSort: the list holding the heap
+lo:         the index of the heap's first position
+root:       the heap position to sift down
+n:          the number of elements in the heap
+
+There is no explicit return value.
+"""
+def siftDown(listToSort, lo, root, n):
+    val = listToSort[lo + root]
+    child = 2 * root + 1
+    while child < n:
+        # Pick the larger child
+        if child + 1 < n and \
+           listToSort[lo + child] < listToSort[lo + child + 1]:
+            child += 1
+        if not val < listToSort[lo + child]:
+            break
+        listToSort[lo + root] = listToSort[lo + child]
+        root = child
+        child = 2 * root + 1
+    listToSort[lo + root] = val
+    return
+
+"""
+siftFromLeaf: this function puts val into a heap whose root position is
+empty (Floyd's method). The empty position is moved down to a leaf by
+promoting the larger child at each level, and val is then moved up from
+that leaf until its parent is no smaller.
+
+INPUTS
+listToSort: the list holding the heap
+lo:         the index of the heap's first position
+val:        the value to insert in place of the root
+n:          the number of elements in the heap
+
+There is no explicit return value.
+"""
+def siftFromLeaf(listToSort, lo, val, n):
+    # Move the hole at the root down to a leaf along the larger children
+    hole = 0
+    child = 1
+    while child < n:
+        if child + 1 < n and \
+           listToSort[lo + child] < listToSort[lo + child + 1]:
+            child += 1
+        listToSort[lo + hole] = listToSort[lo + child]
+        hole = child
+        child = 2 * hole + 1
+
+    # Move val up from the leaf while its parent is smaller
+    while hole > 0:
+        parent = (hole - 1) // 2
+        if not listToSort[lo + parent] < val:
+            break
+        listToSort[lo + hole] = listToSort[lo + parent]
+        hole = parent
+    listToSort[lo + hole] = val
+    return
+
+"""
+Selection functions:
+    NthElement
+    PartialSort
+    TopK
+    StreamingTopK
+
+These functions reuse the QuickSort partitioning to find the smallest or
+largest elements of a list without sorting all of it.
+"""
+
+"""
+NthElement
+
+This function rearranges listToSort[lo:hi] in place so that listToSort[k]
+holds the value it would hold if the range were sorted, every value before
+it is no larger, and every value after it is no smaller. It uses introselect:
+quickselect with the same pivots and partition as QuickSort, which only
+continues into the part that contains k, so it takes O(n) time on average.
+Whenever a partition leaves more than 3/4 of the range, the next pivot is
+chosen by the median of medians instead, which bounds the worst case at
+O(n) as well.
+
+INPUTS
+listToSort: an input list
+k:          the index to place, lo <= k < hi
+lo:         the first index of the range (default = 0)
+hi:         one past the last index of the range
+            (default = None, which means len(listToSort))
+
+OUTPUTS
+the value at listToSort[k]
+"""
+def NthElement(listToSort, k, lo=0, hi=None):
+    # Set default value for hi if None.
+    if hi is None:
+        hi = len(listToSort)
+    if k < lo or k >= hi:
+        raise Exception('Index k is outside the range to select from!')
+
+    bad_split = False
+    while hi - lo > INSERTION_CUTOFF:
+        # Guarantee progress with the median of medians after a bad split
+        if bad_split:
+            p = medianOfMedians(listToSort, lo, hi)
+        else:
+            p = choosePivot(listToSort, lo, hi)
+        size = hi - lo
+        p = partition(listToSort, lo, hi, p)
+
+        # Continue into the part that contains k
+        if k < p:
+            hi = p
+        elif k > p:
+            lo = p + 1
+        else:
+            return listToSort[k]
+        bad_split = 4 * (hi - lo) > 3 * size
+
+    # Finish small ranges with insertion sort
+    binaryInsertionSort(listToSort, lo, hi)
+    return listToSort[k]
+
+"""
+medianOfMedians: this function returns the index of a pivot for
+listToSort[lo:hi] that is guaranteed to have at least about 3/10 of the range
+on each side. The range is split into groups of five, the median of each
+group is moved to the front of the range, and the median of those medians is
+selected with NthElement.
+
+INPUTS
+listToSort: the list being selected from
+lo:         the first index of the range
+hi:         one past the last index of the range
+
+OUTPUTS
+the index of the chosen pivot
+"""
+def medianOfMedians(listToSort, lo, hi):
+    num_groups = 0
+    for group in range(lo, hi, 5):
+        # Sort the group of (at most) five and move its median to the front
+        end = min(group + 5, hi)
+        binaryInsertionSort(listToSort, group, end)
+        median = (group + end - 1) // 2
+        listToSort[lo + num_groups], listToSort[median] = \
+        listToSort[median], listToSort[lo + num_groups]
+        num_groups += 1
+
+    mid = lo + (num_groups - 1) // 2
+    NthElement(listToSort, mid, lo, lo + num_groups)
+    return mid
+
+"""
+PartialSort
+
+This function rearranges listToSort in place so that its first k elements are
+the k smallest elements in sorted order. The order of the remaining elements
+is unspecified. It costs O(n + k log k) instead of O(n log n).
+
+INPUTS
+listToSort: an input list
+k:          the number of smallest elements to sort into place
+
+OUTPUTS
+listToSort: the input list, partially sorted
+"""
+def PartialSort(listToSort, k):
+    k = min(k, len(listToSort))
+    if k <= 0:
+        return listToSort
+
+    # Gather the k smallest elements at the front, then sort just those
+    NthElement(listToSort, k - 1)
+    QuickSort(listToSort, 0, k - 1)
+    return listToSort
+
+"""
+TopK
+
+This function returns the k smallest elements of a list in ascending order,
+or with largest=True the k largest elements in descending order. The input
+list is not changed.
+
+INPUTS
+listToSort: an input list
+k:          the number of elements to return
+largest:    set to True to return the largest elements (default = False)
+
+OUTPUTS
+a new list of the k smallest (or largest) elements
+"""
+def TopK(listToSort, k, largest=False):
+    n = len(listToSort)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    values = listToSort.copy()
+    if largest:
+        # The k largest are the elements from index n - k onwards
+        NthElement(values, n - k)
+        top = values[n - k:]
+        QuickSort(top, reverse=True)
+    else:
+        NthElement(values, k - 1)
+        top = values[:k]
+        QuickSort(top)
+    return top
+
+"""
+StreamingTopK
+
+This function returns the k smallest elements of an iterable in ascending
+order, or with largest=True the k largest elements in descending order. It
+makes one pass over the iterable and only keeps the best k elements seen so
+far in a heap, so it needs O(k) memory and O(n log k) time. Use it for
+iterators that are too large to hold in a list.
+
+INPUTS
+iterable: an iterable of comparable values
+k:        the number of elements to return
+largest:  set to True to return the largest elements (default = False)
+
+OUTPUTS
+a new list of the k smallest (or largest) elements
+"""
+def StreamingTopK(iterable, k, largest=False):
+    if k <= 0:
+        return []
+
+    heap = []
+    if largest:
+        # Min-heap of the largest elements: the root is the one to replace
+        for val in iterable:
+            if len(heap) < k:
+                heapq.heappush(heap, val)
+            elif heap[0] < val:
+                heapq.heapreplace(heap, val)
+        heapSortRange(heap, 0, len(heap))
+        heap.reverse()
+    else:
+        # Max-heap of the smallest elements: the root is the one to replace
+        for val in iterable:
+            if len(heap) < k:
+                heap.append(val)
+                if len(heap) == k:
+                    for root in reversed(range(k // 2)):
+                        siftDown(heap, 0, root, k)
+            elif val < heap[0]:
+                heap[0] = val
+                siftDown(heap, 0, 0, k)
+        heapSortRange(heap, 0, len(heap))
+    return heap
+
+"""
+RadixSort
+
+This function sorts a sequence of integers or floats in place without
+comparing elements. Each value is mapped to a non-negative integer key whose
+order matches the order of the values: integers are shifted by the minimum
+value, and floats have their IEEE 754 bit pattern transformed so that the
+keys of negative values come first (sign bit set: flip all bits; otherwise:
+flip only the sign bit). The keys are then sorted least significant byte
+first, one counting-sort pass per byte, and passes where every key has the
+same byte are skipped. Finally the keys are mapped back to values. The cost
+is O(n*b) for b key bytes, instead of O(n log n) comparisons.
+
+The input may be a list, an array.array, or a NumPy array, and is sorted in
+place. All values must be integers, or all values must be floats. With the
+float transform, NaNs sort after +inf (or before -inf if their sign bit is
+set), and -0.0 sorts before 0.0. Values of subclasses of int or float (such
+as bool) would come back as plain ints or floats from their keys, so they
+are sorted by comparison with MergeSort instead.
+
+INPUTS
+listToSort: an input sequence of ints or floats that may be sorted or
+    unsorted
+
+OUTPUTS
+listToSort: the input sequence sorted in place
+"""
+def RadixSort(listToSort):
+    # Calculate length of input sequence
+    list_length = len(listToSort)
+
+    # Base case: If sequence has zero or one element, return
+    if list_length < 2:
+        return listToSort
+
+    # Copy the values into a list of Python numbers. array.array and NumPy
+    # arrays both provide tolist().
+    if hasattr(listToSort, 'tolist'):
+        values = listToSort.tolist()
+    else:
+        values = list(listToSort)
+
+    # Map the values to non-negative integer keys
+    if all(type(x) is int for x in values):
+        min_val = min(values)
+        keys = [x - min_val for x in values]
+        num_bytes = (max(keys).bit_length() + 7) // 8
+        keys = radixSortKeys(keys, num_bytes)
+        sorted_values = [k + min_val for k in keys]
+    elif all(type(x) is float for x in values):
+        keys = floatsToKeys(values)
+        keys = radixSortKeys(keys, 8)
+        sorted_values = keysToFloats(keys)
+    elif all(isinstance(x, int) for x in values) or \
+         all(isinstance(x, float) for x in values):
+        # Keep the types of bools and other subclasses by comparing values
+        sorted_values = MergeSort(values)
+    else:
+        raise Exception('RadixSort needs all ints or all floats!')
+
+    # Copy the sorted values back into the input sequence
+    if isinstance(listToSort, array):
+        listToSort[:] = array(listToSort.typecode, sorted_values)
+    else:
+        listToSort[:] = sorted_values
+
+    return listToSort
+
+"""
+RadixSort helper functions:
+    radixSortKeys
+    floatsToKeys
+    keysToFloats
+"""
+
+# Mask of the sign bit and of all the bits of a 64-bit float.
+SIGN_BIT = 1 << 63
+ALL_BITS = (1 << 64) - 1
+
+"""
+radixSortKeys: this function sorts a list of non-negative integer keys with
+a least significant digit radix sort on 8-bit digits. The digit counts for
+every pass are gathered in one read of the keys. Each pass then turns its
+counts into starting positions and scatters the keys into a new list, which
+keeps keys with equal digits in their current order.
+
+INPUTS
+keys:      a list of non-negative integers less than 256**num_bytes
+num_bytes: the number of bytes needed to represent the largest key
+
+OUTPUTS
+keys: a sorted list of the keys
+"""
+def radixSortKeys(keys, num_bytes):
+    list_length = len(keys)
+
+    # Count the occurrences of every byte value for every pass at once
+    counts = [[0] * 256 for b in range(num_bytes)]
+    for k in keys:
+        for count in counts:
+            count[k & 255] += 1
+            k >>= 8
+
+    shift = 0
+    for count in counts:
+        # Skip the pass if every key has the same byte here
+        if list_length in count:
+            shift += 8
+            continue
+
+        # Turn the counts into the starting position of each byte value
+        total = 0
+        for digit in range(256):
+            count[digit], total = total, total + count[digit]
+
+        # Scatter the keys to their positions for this byte
+        out = [0] * list_length
+        for k in keys:
+            digit = (k >> shift) & 255
+            out[count[digit]] = k
+            count[digit] += 1
+        keys = out
+        shift += 8
+
+    return keys
+
+"""
+floatsToKeys: this function maps a list of floats to 64-bit unsigned integer
+keys that sort in the same order as the floats.
+
+INPUTS
+values: a list of floats
+
+OUTPUTS
+keys: a list of integer keys
+"""
+def floatsToKeys(values):
+    bits = array('Q')
+    bits.frombytes(array('d', values).tobytes())
+    return [k ^ ALL_BITS if k & SIGN_BIT else k | SIGN_BIT for k in bits]
+
+"""
+keysToFloats: this function is the inverse of floatsToKeys.
+
+INPUTS
+keys: a list of integer keys from floatsToKeys
+
+OUTPUTS
+values: a list of floats
+"""
+def keysToFloats(keys):
+    bits = array('Q', [k ^ SIGN_BIT if k & SIGN_BIT else k ^ ALL_BITS \
+                       for k in keys])
+    values = array('d')
+    values.frombytes(bits.tobytes())
+    return values.tolist()
+
+# Groups with at most this many strings are finished with binary insertion
+# sort by StringSort, and the most characters it buckets on at once.
+STRING_CUTOFF = 64
+MAX_KEY_CHARS = 4
+
+"""
+StringSort
+
+This function sorts a list of strings (or a list of bytes) in place with a
+most-significant-digit radix sort. A group of strings that share their first
+d characters is split into buckets on the slice s[d:d + k], and the buckets
+are sorted again from position d + k. Before splitting, the prefix shared
+by the smallest and largest string of the group is skipped with commonLength,
+so a prefix shared by many strings is compared in C instead of one character
+at a time. A string that ends inside the slice has a shorter key, which
+sorts before the longer keys that extend it, and every string in its bucket
+is equal. Buckets with at most STRING_CUTOFF strings are finished with binary
+insertion sort right away. The larger buckets are kept on an explicit stack,
+so there is no recursion limit.
+
+The slice width k starts at 1 and adapts per group: it grows (up to
+MAX_KEY_CHARS) when a split gives fewer than 32 buckets, as for DNA reads
+over four letters, and shrinks when the buckets hold fewer than 4 strings each,
+as for text over a large Unicode alphabet. On the sharedPrefix and
+genomeReads families of p1benchmark.py with 65536 to 262144 strings
+StringSort takes about two thirds of the time of QuickSort; on a few
+thousand strings the two are about even.
+
+INPUTS
+listToSort: an input list of str (or of bytes) that may be sorted or
+    unsorted
+
+OUTPUTS
+listToSort: the input list sorted in place
+"""
+def StringSort(listToSort):
+    output = []
+    stack = [(listToSort[:], 0, 1)]
+    while stack:
+        group, d, k = stack.pop()
+
+        # A negative position marks a group that is already sorted
+        if d < 0:
+            output.extend(group)
+            continue
+        if len(group) <= STRING_CUTOFF:
+            start = len(output)
+            output.extend(group)
+            binaryInsertionSort(output, start, len(output))
+            continue
+
+        # Skip the characters shared by every string in the group
+        smallest = min(group)
+        largest = max(group)
+        if smallest == largest:
+            output.extend(group)
+            continue
+        d = commonLength(smallest, largest, d)
+
+        # Split the group on the next k characters
+        buckets = {}
+        for val in group:
+            key = val[d:d + k]
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [val]
+            else:
+                bucket.append(val)
+
+        # Adapt the slice width to how finely the group was split
+        nextK = k
+        if 4 * len(buckets) > len(group):
+            nextK = max(1, k - 1)
+        elif len(buckets) < 32:
+            nextK = min(MAX_KEY_CHARS, k + 1)
+
+        # Sort the small buckets now, gathered into runs between the large
+        # buckets. A bucket of strings that ended is equal and already sorted.
+        parts = []
+        run = []
+        for key in sorted(buckets):
+            bucket = buckets[key]
+            if len(key) == k and len(bucket) > STRING_CUTOFF:
+                if run:
+                    parts.append((run, -1, nextK))
+                    run = []
+                parts.append((bucket, d + k, nextK))
+            else:
+                start = len(run)
+                run.extend(bucket)
+                if len(key) == k and len(bucket) > 1:
+                    binaryInsertionSort(run, start, len(run))
+        if run:
+            parts.append((run, -1, nextK))
+
+        # Push the parts last first so the smallest is popped next
+        parts.reverse()
+        stack.extend(parts)
+
+    listToSort[:] = output
+    return listToSort
+
+"""
+commonLength: this function returns the length of the common prefix of two
+strings that are known to share their first d characters. It compares
+slices of doubling width, then binary searches the slice that differs.
+
+INPUTS
+a: a str (or bytes)
+b: a str (or bytes) of the same type
+d: a number of leading characters that a and b are known to share
+
+OUTPUTS
+length: the number of leading characters that a and b share
+"""
+def commonLength(a, b, d):
+    n = min(len(a), len(b))
+    step = 16
+    while d < n:
+        end = min(n, d + step)
+        if a[d:end] != b[d:end]:
+            break
+        d = end
+        step *= 2
+    else:
+        return n
+
+    # The first difference is in a[d:end]
+    lo = d
+    hi = end
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if a[lo:mid + 1] == b[lo:mid + 1]:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+"""
+BufferSort
+
+This function sorts the numbers in a writable buffer in place, without
+copying them into a list. The buffer can be any object that supports the
+buffer protocol: an array.array, a NumPy array, a bytearray, a memoryview
+(for example of part of a larger array), or an mmap of a binary file. Raw
+byte buffers such as bytearray and mmap are read as values of the given
+typecode, so an mmap of a file of int64 records is sorted with
+typecode='q'.
+
+The buffer is viewed through a memoryview cast to its element type, which
+reads and writes the values in the buffer's own memory. With alg=None, and
+if NumPy is installed and the buffer is contiguous, the typed fast path
+wraps the same memory in a NumPy array with no copy and sorts it with NumPy's
+compiled sort. Otherwise (or for an explicit alg) the memoryview itself is
+sorted by alg, which must only index and assign elements: QuickSort (the
+default) and HeapSort do, and use O(log n) and O(1) extra memory. Sorts that
+copy slices into temporary buffers, such as MergeSort, are not allowed,
+because slices of a memoryview are views.
+
+INPUTS
+buf:      a writable buffer of numbers
+typecode: the array typecode of the values, e.g. 'q' or 'd', needed for
+          buffers of raw bytes (default = None, use the buffer's own type)
+alg:      the in-place sort to use, QuickSort or HeapSort, or None for the
+          NumPy fast path when available (default = None)
+
+OUTPUTS
+buf: the input buffer, sorted in place
+"""
+def BufferSort(buf, typecode=None, alg=None):
+    view = typedView(buf, typecode)
+
+    # Typed fast path: a NumPy array over the same (contiguous) memory
+    if alg is None and not view.c_contiguous:
+        alg = QuickSort
+    if alg is None:
+        try:
+            import numpy as np
+        except ImportError:
+            alg = QuickSort
+        else:
+            np.frombuffer(view, dtype=view.format).sort()
+            return buf
+
+    if alg not in (QuickSort, HeapSort):
+        raise Exception('BufferSort needs an in-place sort: QuickSort or ' + \
+                        'HeapSort!')
+    alg(view)
+    return buf
+
+"""
+BufferSort helper functions:
+    typedView
+"""
+
+# The typecodes BufferSort can sort.
+BUFFER_TYPECODES = frozenset('bBhHiIlLqQfd')
+
+"""
+typedView: this function returns a writable, one-dimensional memoryview of a
+buffer whose elements are numbers of the given typecode.
+
+INPUTS
+buf:      a writable buffer
+typecode: the typecode to read the buffer as, or None for its own format
+
+OUTPUTS
+view: a memoryview of buf
+"""
+def typedView(buf, typecode):
+    view = memoryview(buf)
+    if view.readonly:
+        raise Exception('BufferSort needs a writable buffer!')
+
+    # Reinterpret the bytes if asked to, or flatten a multi-dimensional view
+    if typecode is not None and typecode != view.format:
+        view = view.cast('B').cast(typecode)
+    elif view.ndim != 1:
+        view = view.cast('B').cast(view.format)
+
+    if view.format not in BUFFER_TYPECODES:
+        raise Exception('BufferSort cannot sort values of format %r!' \
+                        % view.format)
+    return view
+
+"""
+ArgSort
+
+This function returns the permutation that sorts a column, instead of
+sorting it: column[perm[0]], column[perm[1]], ... is in ascending order.
+Equal values keep their original order, whatever alg is. Other columns of
+the same table can then be put in this order once with Gather. See LexArgSort
+for how the permutation is computed.
+
+INPUTS
+column:  a list, array.array or NumPy array of values
+alg:     the sorting function to use, e.g. MergeSort or QuickSort
+         (default = MergeSort)
+reverse: set to True to sort in descending order (default = False)
+
+OUTPUTS
+perm: the sorting permutation, as an array('l'), or as a NumPy int array if
+      column is a NumPy array
+"""
+def ArgSort(column, alg=MergeSort, reverse=False):
+    return LexArgSort([column], alg, reverse)
+
+"""
+LexArgSort
+
+This function returns the permutation that sorts the rows of a table
+lexicographically by several columns: by columns[0], then rows with equal
+columns[0] by columns[1], and so on. Equal rows keep their original order.
+
+If every column holds only ints or only floats, each row is packed into a
+single integer key: each column is mapped to non-negative integers in the
+same order (ints shifted by their minimum, floats through floatsToKeys as in
+RadixSort, and both flipped for a descending column), the columns are
+concatenated bit by bit, and the row index goes in the lowest bits. Sorting
+these keys with alg compares plain ints, and the index is read back from the
+low bits. Otherwise, there is one stable pass per column from the last
+column to the first, each sorting (value, position) pairs with alg, as in
+sortByKey.
+
+INPUTS
+columns: a list of columns of equal length, each a list, array.array or
+         NumPy array
+alg:     the sorting function to use, e.g. MergeSort or QuickSort
+         (default = MergeSort)
+reverse: True or False for every column, or a list with one such value per
+         column, for descending order (default = False)
+
+OUTPUTS
+perm: the sorting permutation, as an array('l'), or as a NumPy int array if
+      columns[0] is a NumPy array
+"""
+def LexArgSort(columns, alg=MergeSort, reverse=False):
+    n = len(columns[0])
+    if any(len(column) != n for column in columns):
+        raise Exception('All columns must have the same length!')
+    if reverse is True or reverse is False:
+        reverse = [reverse] * len(columns)
+
+    # Copy the columns into lists of Python values
+    values = [column.tolist() if hasattr(column, 'tolist') else \
+              list(column) for column in columns]
+
+    keys = packRowKeys(values, reverse)
+    if keys is not None:
+        # One sort of packed integer keys; the index is in the low bits
+        alg(keys)
+        mask = (1 << n.bit_length()) - 1
+        perm = [k & mask for k in keys]
+    else:
+        # One stable pass per column, least significant column first
+        perm = list(range(n))
+        for col, rev in zip(reversed(values), reversed(reverse)):
+            if rev:
+                decorated = [(col[i], -pos) for pos, i in enumerate(perm)]
+                alg(decorated)
+                decorated.reverse()
+                perm = [perm[-pos] for val, pos in decorated]
+            else:
+                decorated = [(col[i], pos) for pos, i in enumerate(perm)]
+                alg(decorated)
+                perm = [perm[pos] for val, pos in decorated]
+
+    # Return the permutation in the type that matches the input
+    if hasattr(columns[0], 'dtype'):
+        import numpy as np
+        return np.array(perm, dtype=np.intp)
+    return array('l', perm)
+
+"""
+Argsort helper functions:
+    packRowKeys
+    Gather
+"""
+
+"""
+packRowKeys: this function packs each row of a table of int and float
+columns, followed by its row index, into one non-negative integer, such that
+the integers sort in the order of the rows.
+
+INPUTS
+values:  a list of columns, each a list of Python values
+reverse: a list with True for each column to sort in descending order
+
+OUTPUTS
+keys: a list with one integer per row, or None if some column is not all
+      ints or all floats
+"""
+def packRowKeys(values, reverse):
+    n = len(values[0])
+    keys = [0] * n
+    for col, rev in zip(values, reverse):
+        if all(isinstance(x, int) for x in col):
+            if n == 0:
+                continue
+            low = min(col)
+            high = max(col)
+            if rev:
+                col_keys = [high - x for x in col]
+            else:
+                col_keys = [x - low for x in col]
+            width = (high - low).bit_length()
+        elif all(isinstance(x, float) for x in col):
+            col_keys = floatsToKeys(col)
+            if rev:
+                col_keys = [ALL_BITS - k for k in col_keys]
+            width = 64
+        else:
+            return None
+        keys = [(k << width) | c for k, c in zip(keys, col_keys)]
+
+    # Append the row index, which breaks every tie in the original order
+    width = n.bit_length()
+    return [(k << width) | i for i, k in enumerate(keys)]
+
+"""
+Gather
+
+This function puts a column in the order of a permutation, e.g. one returned
+by ArgSort or LexArgSort, with one pass over the permutation.
+
+INPUTS
+column: a list, array.array or NumPy array
+perm:   a permutation of range(len(column))
+
+OUTPUTS
+a new column of the same type as column, holding column[perm[0]],
+column[perm[1]], ...
+"""
+def Gather(column, perm):
+    if hasattr(column, 'dtype'):
+        return column[perm]
+    elif isinstance(column, array):
+        return array(column.typecode, [column[i] for i in perm])
+    return [column[i] for i in perm]
+
+"""
+sort
+
+This function sorts an input list in place with whichever of the sorts above
+should be fastest for it, so callers do not have to choose. It looks at
+SAMPLE_SIZE evenly spaced positions of the list to estimate how presorted
+it is (the fraction of sampled neighbors that are out of order) and how many
+distinct values it has, and to guess its element type. It then uses:
+    BinaryInsertionSort   for n <= SMALL_SORT_N
+    TimSort               if at most PRESORTED_RATIO of the sampled neighbors
+                          are out of order (or in order, for mostly
+                          descending input)
+    RadixSort             for n >= RADIX_MIN_N ints that span at most
+                          RADIX_MAX_KEY_BYTES bytes
+    QuickSort (threeWay)  if at most FEW_UNIQUE_RATIO of the sampled values
+                          are distinct
+    QuickSort             otherwise
+The thresholds come from runs of calibrateDispatch in p1benchmark.py. Each
+decision is logged at INFO level on the 'project1' logger, and chooseSort
+returns the decision without sorting.
+
+INPUTS
+listToSort: an input list that may be sorted or unsorted
+key: a function of one argument used to extract a comparison key from each
+    element, called once per element (default = None, compare elements)
+reverse: set to True to sort in descending order (default = False)
+
+OUTPUTS
+listToSort: the input list sorted in place
+"""
+def sort(listToSort, key=None, reverse=False):
+    # Sort decorated copies of the elements if a key or reverse is given
+    if key is not None or reverse:
+        return sortByKey(sort, listToSort, key, reverse)
+
+    decision = chooseSort(listToSort)
+    logger.info('sort: n=%d, %s -> %s', decision['n'], \
+                decision['reason'], decision['alg'])
+
+    if decision['alg'] == 'QuickSort' and decision['threeWay']:
+        QuickSort(listToSort, threeWay=True)
+    else:
+        DISPATCH[decision['alg']](listToSort)
+    return listToSort
+
+"""
+sort helper functions and constants:
+    chooseSort
+"""
+
+# The logger that records the choices made by sort.
+logger = logging.getLogger('project1')
+
+# Number of positions sampled by chooseSort.
+SAMPLE_SIZE = 128
+
+# Dispatch thresholds (see calibrateDispatch in p1benchmark.py).
+SMALL_SORT_N = 128          # Largest n sorted with BinaryInsertionSort
+PRESORTED_RATIO = 0.02      # Largest out-of-order fraction for TimSort
+RADIX_MIN_N = 4096          # Smallest n sorted with RadixSort
+RADIX_MAX_KEY_BYTES = 3     # Widest int key range sorted with RadixSort
+FEW_UNIQUE_RATIO = 0.25     # Largest distinct fraction for threeWay QuickSort
+
+# The algorithms sort can choose from, by name.
+DISPATCH = {'BinaryInsertionSort': BinaryInsertionSort,
+            'TimSort': TimSort,
+            'RadixSort': RadixSort,
+            'QuickSort': QuickSort}
+
+"""
+chooseSort: this function decides which algorithm sort would use for
+listToSort, without sorting it.
+
+INPUTS
+listToSort: an input list
+
+OUTPUTS
+decision: a dict with the keys
+    alg:        the name of the chosen algorithm (a key of DISPATCH)
+    threeWay:   whether QuickSort should use three-way partitioning
+    n:          the length of the list
+    disorder:   the sampled fraction of neighbors that are out of order
+                (None if the list was too small to sample)
+    distinct:   the sampled fraction of distinct values (or None)
+    reason:     a short description of why alg was chosen
+"""
+def chooseSort(listToSort):
+    n = len(listToSort)
+    decision = {'alg': 'QuickSort', 'threeWay': False, 'n': n, \
+                'disorder': None, 'distinct': None, 'reason': ''}
+
+    # Small lists: insertion sort has the lowest overhead
+    if n <= SMALL_SORT_N:
+        decision['alg'] = 'BinaryInsertionSort'
+        decision['reason'] = 'small n'
+        return decision
+
+    # Sample evenly spaced neighbor pairs
+    step = (n - 1) / SAMPLE_SIZE
+    positions = [int(k * step) for k in range(SAMPLE_SIZE)]
+    sample = [listToSort[i] for i in positions]
+    descents = sum(1 for i in positions if listToSort[i + 1] < listToSort[i])
+    ascents = sum(1 for i in positions if listToSort[i] < listToSort[i + 1])
+    decision['disorder'] = descents / SAMPLE_SIZE
+
+    # Mostly ascending or mostly descending: long natural runs
+    if descents <= PRESORTED_RATIO * SAMPLE_SIZE:
+        decision['alg'] = 'TimSort'
+        decision['reason'] = 'presorted (disorder %.3f)' % decision['disorder']
+        return decision
+    if ascents <= PRESORTED_RATIO * SAMPLE_SIZE:
+        decision['alg'] = 'TimSort'
+        decision['reason'] = 'reverse presorted (disorder %.3f)' \
+                             % decision['disorder']
+        return decision
+
+    # Ints with a narrow range: few radix passes
+    if n >= RADIX_MIN_N and all(type(x) is int for x in sample):
+        if all(type(x) is int for x in listToSort):
+            key_bytes = ((max(listToSort) - min(listToSort)).bit_length() \
+                         + 7) // 8
+            if key_bytes <= RADIX_MAX_KEY_BYTES:
+                decision['alg'] = 'RadixSort'
+                decision['reason'] = 'ints, %d key bytes' % key_bytes
+                return decision
+
+    # Many duplicates: keep the equal values out of the recursion. Note that
+    # the sample values may be unhashable, so count them by sorting.
+    sample.sort()
+    distinct = 1 + sum(1 for k in range(1, SAMPLE_SIZE) \
+                       if sample[k - 1] < sample[k])
+    decision['distinct'] = distinct / SAMPLE_SIZE
+    if distinct <= FEW_UNIQUE_RATIO * SAMPLE_SIZE:
+        decision['threeWay'] = True
+        decision['reason'] = 'few unique (distinct %.3f)' \
+                             % decision['distinct']
+        return decision
+
+    decision['reason'] = 'general (disorder %.3f, distinct %.3f)' \
+                         % (decision['disorder'], decision['distinct'])
+    return decision
+
+"""
+Importing the testing code after function defs to ensure same references.
+"""
+from project1tests import *
+
+"""
+Main function.
 """
 if __name__ == "__main__":
     print('Testing Selection Sort')
@@ -240,6 +2264,10 @@ if __name__ == "__main__":
     print()
     testingSuite(InsertionSort)
     print()
+    print('Testing Binary Insertion Sort')
+    print()
+    testingSuite(BinaryInsertionSort)
+    print()
     print('Testing Bubble Sort')
     print()
     testingSuite(BubbleSort)
@@ -248,10 +2276,49 @@ if __name__ == "__main__":
     print()
     testingSuite(MergeSort)
     print()
+    print('Testing Tim Sort')
+    print()
+    testingSuite(TimSort)
+    print()
+    print('Testing In-Place Merge Sort')
+    print()
+    testingSuite(InPlaceMergeSort)
+    print()
+    print('Testing Heap Sort')
+    print()
+    testingSuite(HeapSort)
+    print()
     print('Testing Quick Sort')
     print()
     testingSuite(QuickSort)
     print()
+    print('Testing Radix Sort')
+    print()
+    testingSuite(RadixSort)
+    print()
+    print('Testing String Sort')
+    print()
+    testStringSort(StringSort)
+    print()
+    print('Testing SortedList')
+    print()
+    testSortedList()
+    print()
+    print('Testing ArgSort')
+    print()
+    testArgSort(alg=MergeSort)
+    testArgSort(alg=QuickSort)
+    print()
+    print('Testing BufferSort')
+    print()
+    testBufferSort(alg=None)
+    testBufferSort(alg=QuickSort)
+    testBufferSort(alg=HeapSort)
+    print()
+    print('Testing BatchSort')
+    print()
+    testBatchSort()
+    print()
     print('UNSORTED measureTime')
     print()
     measureTime()
@@ -11,13 +11,37 @@ import random
 import matplotlib.pyplot as plt
 import scipy.stats as stats
 import numpy
+import os
+import tempfile
+import tracemalloc
+import mmap
+from array import array
+from multiprocessing import cpu_count
 
 # Import the provided code.
 from project1 import SelectionSort
 from project1 import InsertionSort
+from project1 import BinaryInsertionSort
 from project1 import BubbleSort
 from project1 import MergeSort
+from project1 import TimSort
+from project1 import InPlaceMergeSort
+from project1 import HeapSort
 from project1 import QuickSort
+from project1 import RadixSort
+from project1 import StringSort
+from project1 import ArgSort
+from project1 import LexArgSort
+from project1 import Gather
+from project1 import BufferSort
+from p1parallel import ParallelSort
+from p1parallel import sampleBuckets, combineChunks
+from p1sortedlist import SortedList
+from p1batch import BatchSort
+from p1instrument import instrumentSort
+
+# Import the external sort module as a whole, since it imports project1 too.
+import p1external
 
 """
 isSorted
@@ -57,20 +81,28 @@ INPUTS
 alg: function pointer for alg to test, the options are:
     SelectionSort
     InsertionSort
+    BinaryInsertionSort
     BubbleSort
     MergeSort
+    TimSort
+    InPlaceMergeSort
+    HeapSort
     QuickSort
+    RadixSort
+instrument: set to True to also print the comparison, move, allocation and
+    call depth counters for each test (default = False)
 
 OUTPUTS
 Printed statements indicating which tests passed/failed.
 """
-def testingSuite(alg):
+def testingSuite(alg, instrument = False):
     # First, we seed the random number generator to ensure reproducibility.
     random.seed(1)
 
     # List of possible algs.
-    algs = ['SelectionSort', 'InsertionSort', \
-            'BubbleSort', 'MergeSort', 'QuickSort']
+    algs = ['SelectionSort', 'InsertionSort', 'BinaryInsertionSort', \
+            'BubbleSort', 'MergeSort', 'TimSort', 'InPlaceMergeSort', \
+            'HeapSort', 'QuickSort', 'RadixSort']
 
     # Make sure the input is a proper alg to consider.
     if not alg.__name__ in algs:
@@ -121,25 +153,56 @@ def testingSuite(alg):
     tests.append([random.random() for x in range(0,2**6-1)])
     message.append('random real numbers')
 
+    # Sort a copy of each test and check it.
+    def check(tInd):
+        temp = tests[tInd].copy()
+        alg(tests[tInd])
+        if not isSorted(temp, tests[tInd]):
+            return False
+
+        # Report the work done on the same input.
+        if instrument:
+            _, counters = instrumentSort(alg, temp)
+            return True, str(counters)
+        return True
+
+    runTests(message, check)
+    return
+
+"""
+runTests
+
+This function will run a list of named tests and print which ones passed,
+failed or threw an error, followed by the number of tests passed. check is
+called with the index of each test, and returns True or False, or a pair
+(True or False, note) to print the note under the test's line.
+
+INPUTS
+message: the name of each test
+check: function pointer that runs the test with the given index
+
+OUTPUTS
+Printed statements indicating which tests passed/failed. The number of
+tests passed is also returned.
+"""
+def runTests(message, check):
     # Store total number of passed tests.
     passed = 0
 
     # Loop over the tests.
-    for tInd in range(0,len(tests)):
-        # Copy the test for sorting.
-        temp = tests[tInd].copy()
-
-        # Try to sort, but allow for errors.
+    for tInd in range(0,len(message)):
+        # Try to run the test, but allow for errors.
         try:
-            # Do the sort.
-            alg(tests[tInd])
-            
-            # Check if the test succeeded.
-            if isSorted(temp, tests[tInd]):
+            result = check(tInd)
+            success, note = result if isinstance(result, tuple) else \
+                            (result, None)
+            if success:
                 print('Test %d Success: %s' % (tInd+1, message[tInd]))
                 passed += 1
             else:
                 print('Test %d FAILED: %s' % (tInd+1, message[tInd]))
+            if note is not None:
+                print('    %s' % note)
 
         # Catch any errors.
         except Exception as e:
@@ -152,17 +215,22 @@ def testingSuite(alg):
 
     # Done testing, print and return.
     print()
-    print('%d/9 Tests Passed' % passed)
-    return
+    print('%d/%d Tests Passed' % (passed, len(message)))
+    return passed
 
 """
 measureTime
 
+Note: this function saves plots with matplotlib and times each sort only once
+per trial with time.time(). For headless, statistically sound timings, use
+runBenchmarks in p1benchmark.py instead.
+
 This function will generate lists of varying lengths and sort them using your
 implemented fuctions. It will time these sorting operations, and store the
 average time across 30 trials of a particular size n. It will then create plots
 of runtime vs n. It will also output the slope of the log-log plots generated
-for several of the sorting algorithms.
+for several of the sorting algorithms, and the smallest n from which
+BinaryInsertionSort stays faster than InsertionSort.
 
 INPUTS
 preSorted: set to True to test with only pre-sorted inputs
@@ -172,7 +240,8 @@ numTrials: the number of trials to average timing data across
 
 OUTPUTS
 A number of genereated runtime vs n plot, a log-log plot for several
-algorithms, and printed statistics about the slope of the log-log plots.
+algorithms, printed statistics about the slope of the log-log plots, and
+the printed insertion sort crossover n.
 """
 def measureTime(preSorted = False, numTrials = 30):
     # Print whether we are using sorted inputs.
@@ -191,12 +260,12 @@ def measureTime(preSorted = False, numTrials = 30):
     ISind = 1
     BBind = 2
     TIMind = 5
+    BISind = 7
 
     # We now define the range of n values to consider.
     if preSorted:
         # Need to look at larger n to get a good sense of runtime.
         # Look at n from 20 to 980.
-        # Note that 1000 causes issues with recursion depth for merge and quick.
         N = list(range(1,50))
         N = [20*x for x in N]
         scaleN = 10 # Make insertion and bubble do larger tests.
@@ -208,7 +277,8 @@ def measureTime(preSorted = False, numTrials = 30):
     # Store the different algs to consider.
     algs = [SelectionSort, InsertionSort, \
             BubbleSort, MergeSort, \
-            QuickSort, list.sort]
+            QuickSort, list.sort, \
+            RadixSort, BinaryInsertionSort]
 
     # Preallocate space to store the runtimes.
     tSelectionSort = N.copy()
@@ -217,9 +287,11 @@ def measureTime(preSorted = False, numTrials = 30):
     tMergeSort = N.copy()
     tQuickSort = N.copy()
     tPython = N.copy()
+    tRadixSort = N.copy()
+    tBinaryInsertionSort = N.copy()
 
     # Create some flags for whether each sorting alg works.
-    isCorrect = [True, True, True, True, True, True]
+    isCorrect = [True, True, True, True, True, True, True, True]
 
     # Loop over the different sizes.
     for nInd in range(0,len(N)):
@@ -227,7 +299,7 @@ def measureTime(preSorted = False, numTrials = 30):
         n = N[nInd]
         
         # Reset the running sum of the runtimes.
-        timing = [0,0,0,0,0,0]
+        timing = [0,0,0,0,0,0,0,0]
         
         # Loop over the tests.
         for test in range(1,numTrials+1):
@@ -236,7 +308,8 @@ def measureTime(preSorted = False, numTrials = 30):
             for aI in range(0,len(algs)):
                 # If preSorted and insertion or bubble or tim, make the 
                 # testing list longer to get better tests...
-                if preSorted and (aI == ISind or aI == BBind or aI == TIMind):
+                if preSorted and (aI == ISind or aI == BBind or \
+                                  aI == TIMind or aI == BISind):
                     listToSort = list(range(0,n*scaleN))
                 else:
                     listToSort = list(range(0,n))
@@ -275,10 +348,12 @@ def measureTime(preSorted = False, numTrials = 30):
         tMergeSort[nInd] = timing[3]
         tQuickSort[nInd] = timing[4]
         tPython[nInd] = timing[5]
+        tRadixSort[nInd] = timing[6]
+        tBinaryInsertionSort[nInd] = timing[7]
 
     # If there was an error in one of the plotting algs, report it.
-    for aI in range(0,len(algs)-1):
-        if not isCorrect[aI]:
+    for aI in range(0,len(algs)):
+        if aI != TIMind and not isCorrect[aI]:
             print('%s not implemented properly!!!' % algs[aI].__name__)
             
     # Now plot the timing data.
@@ -287,7 +362,8 @@ def measureTime(preSorted = False, numTrials = 30):
         alg = algs[aI].__name__ if aI != 5 else 'Python'
 
         # Plot.
-        scaleNP = scaleN if (aI == ISind or aI == BBind or aI == TIMind) else 1
+        scaleNP = scaleN if (aI == ISind or aI == BBind or \
+                             aI == TIMind or aI == BISind) else 1
         plt.figure()
         plt.plot([scaleNP*nn for nn in N],locals()['t%s' % alg])
         plt.title('%s runtime versus n' % alg)
@@ -303,9 +379,12 @@ def measureTime(preSorted = False, numTrials = 30):
     fig, ax = plt.subplots()
     ax.plot(N,tSelectionSort, label='Selection')
     ax.plot([scaleN*nn for nn in N],tInsertionSort, label='Insertion')
+    ax.plot([scaleN*nn for nn in N],tBinaryInsertionSort, \
+            label='Binary Insertion')
     ax.plot([scaleN*nn for nn in N],tBubbleSort, label='Bubble')
     ax.plot(N,tMergeSort, label='Merge')
     ax.plot(N,tQuickSort, label='Quick')
+    ax.plot(N,tRadixSort, label='Radix')
     ax.plot([scaleN*nn for nn in N],tPython, label='Python')
     if preSorted:
         legend = ax.legend(loc='upper right')
@@ -328,6 +407,7 @@ def measureTime(preSorted = False, numTrials = 30):
     logBS = [(numpy.log(x) if x>0 else -16) for x in tBubbleSort]
     logMS = [(numpy.log(x) if x>0 else -16) for x in tMergeSort]
     logQS = [(numpy.log(x) if x>0 else -16) for x in tQuickSort]
+    logRS = [(numpy.log(x) if x>0 else -16) for x in tRadixSort]
 
     # Linear regression.
     mSS, _, _, _, _ = stats.linregress(logN,logSS)
@@ -366,6 +446,7 @@ def measureTime(preSorted = False, numTrials = 30):
     logBS = logBS[indCut:]
     logMS = logMS[indCut:]
     logQS = logQS[indCut:]
+    logRS = logRS[indCut:]
 
     # Linear regression.
     mSS, _, _, _, _ = stats.linregress(logN,logSS)
@@ -373,6 +454,7 @@ def measureTime(preSorted = False, numTrials = 30):
     mBS, _, _, _, _ = stats.linregress(scaleLogN,logBS)
     mMS, _, _, _, _ = stats.linregress(logN,logMS)
     mQS, _, _, _, _ = stats.linregress(logN,logQS)
+    mRS, _, _, _, _ = stats.linregress(logN,logRS)
 
     # Print the regression info.
     print('Selection Sort log-log Slope (n>%d): %f' \
@@ -385,6 +467,550 @@ def measureTime(preSorted = False, numTrials = 30):
           % (cutoff, mMS))
     print('Quick Sort log-log Slope (n>%d): %f' \
           % (cutoff, mQS))
+    print('Radix Sort log-log Slope (n>%d): %f' \
+          % (cutoff, mRS))
+
+    # Find the smallest n from which binary insertion sort stays faster.
+    crossover = None
+    for nInd in reversed(range(0,len(N))):
+        if tBinaryInsertionSort[nInd] >= tInsertionSort[nInd]:
+            break
+        crossover = scaleN*N[nInd]
+    print()
+    if crossover is None:
+        print('Binary Insertion Sort never stays faster than Insertion Sort')
+    else:
+        print('Binary Insertion Sort faster than Insertion Sort for n>=%d' \
+              % crossover)
 
     # Close all figures.
     plt.close('all')
+
+"""
+measureSpeedup
+
+This function will time ParallelSort on one random list for a range of
+process counts and compare each time to the serial MergeSort on the same
+list. Each time is averaged across numTrials trials. The time of the work
+that ParallelSort always does serially in the parent process (the k-way
+merge for 'merge', the bucket split and concatenation for 'sample') is
+timed on its own and reported for each process count, since it bounds the
+speedup.
+
+INPUTS
+n: the length of the list to sort
+    (default = 2**20)
+procCounts: the list of process counts to time
+    (default = None, which uses 1, 2, 4, ... up to the number of cores)
+numTrials: the number of trials to average timing data across
+    (default = 3)
+alg: the function used by ParallelSort to sort each chunk
+    (default = MergeSort)
+method: the ParallelSort method, 'merge' or 'sample'
+    (default = 'merge')
+
+OUTPUTS
+Printed table of runtime, serial parent time and speedup versus the serial
+MergeSort for each process count. The speedups are also returned as a list.
+"""
+def measureSpeedup(n = 2**20, procCounts = None, numTrials = 3, \
+                   alg = MergeSort, method = 'merge'):
+    # First, we seed the random number generator to ensure consistency.
+    random.seed(1)
+    listToSort = [random.random() for x in range(0,n)]
+
+    # Set default process counts: powers of two up to the number of cores.
+    if procCounts is None:
+        procCounts = [1]
+        while 2*procCounts[-1] <= cpu_count():
+            procCounts.append(2*procCounts[-1])
+        if procCounts[-1] != cpu_count():
+            procCounts.append(cpu_count())
+
+    # Time the serial MergeSort.
+    tSerial = 0
+    for test in range(0,numTrials):
+        copiedList = listToSort.copy()
+        t = time.perf_counter()
+        MergeSort(copiedList)
+        tSerial += time.perf_counter() - t
+    tSerial /= numTrials
+
+    print('Timing ParallelSort (%s) on n = %d' % (method, n))
+    print('Averaging over %d Trials' % numTrials)
+    print()
+    print('Serial MergeSort: %f s' % tSerial)
+    print()
+    print('%8s %12s %12s %10s' % ('procs', 'runtime (s)', 'serial (s)', \
+                                  'speedup'))
+
+    # Time ParallelSort for each process count.
+    speedups = []
+    for numProcs in procCounts:
+        tParallel = 0
+        for test in range(0,numTrials):
+            copiedList = listToSort.copy()
+            t = time.perf_counter()
+            ParallelSort(copiedList, numProcs, alg, method)
+            tParallel += time.perf_counter() - t
+
+            # Ensure that the list was sorted.
+            if not isSorted(listToSort,copiedList):
+                print('ParallelSort not implemented properly!!!')
+        tParallel /= numTrials
+
+        # Time the parent's serial split and combine on their own.
+        t = time.perf_counter()
+        if method == 'sample':
+            values, bounds = sampleBuckets(listToSort, numProcs)
+        else:
+            values = listToSort
+            step = -(-n // numProcs)
+            bounds = [(lo, min(lo + step, n)) for lo in range(0, n, step)]
+        tSplit = time.perf_counter() - t
+        chunks = [sorted(values[lo:hi]) for lo, hi in bounds]
+        t = time.perf_counter()
+        combineChunks(chunks, method)
+        tCombine = tSplit + time.perf_counter() - t
+
+        speedups.append(tSerial/tParallel)
+        print('%8d %12f %12f %10.2f' % (numProcs, tParallel, tCombine, \
+                                        speedups[-1]))
+
+    return speedups
+
+"""
+testExternalSort
+
+This function will write a file of random fixed-width records, sort it with
+ExternalSort under a small memory limit (so that many runs and several
+merge passes are needed), and check the output against Python's sort. The
+peak memory traced while ExternalSort runs must also stay under the limit.
+
+INPUTS
+n: the number of records to sort
+    (default = 100000)
+typecode: the array typecode of the records, 'q' or 'd'
+    (default = 'q')
+memoryLimit: the memory limit in bytes passed to ExternalSort
+    (default = 2**18)
+fanIn: the merge fan-in passed to ExternalSort
+    (default = 4)
+alg: the function used to sort each run
+    (default = MergeSort)
+
+OUTPUTS
+Printed statement indicating whether the test passed, also returned as
+True or False.
+"""
+def testExternalSort(n = 100000, typecode = 'q', memoryLimit = 2**18, \
+                     fanIn = 4, alg = MergeSort):
+    # First, we seed the random number generator to ensure reproducibility.
+    random.seed(1)
+    if typecode == 'd':
+        records = [random.random() for x in range(0,n)]
+    else:
+        records = [random.randint(-2**63, 2**63-1) for x in range(0,n)]
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+        inFile = os.path.join(tmpDir, 'in.bin')
+        outFile = os.path.join(tmpDir, 'out.bin')
+        with open(inFile, 'wb') as f:
+            array(typecode, records).tofile(f)
+
+        # Do the sort, tracing its peak memory.
+        tracemalloc.start()
+        try:
+            base = tracemalloc.get_traced_memory()[0]
+            t = time.perf_counter()
+            p1external.ExternalSort(inFile, outFile, typecode, memoryLimit, \
+                                    fanIn=fanIn, alg=alg)
+            t = time.perf_counter() - t
+            peak = tracemalloc.get_traced_memory()[1] - base
+        finally:
+            tracemalloc.stop()
+
+        # Read back the output.
+        sortedRecords = array(typecode)
+        with open(outFile, 'rb') as f:
+            sortedRecords.frombytes(f.read())
+
+    passed = isSorted(records, sortedRecords.tolist()) and peak <= memoryLimit
+    if passed:
+        print('External sort Success: %d records in %f s, peak %d bytes' \
+              % (n, t, peak))
+    else:
+        print('External sort FAILED: %d records, peak %d bytes (limit %d)' \
+              % (n, peak, memoryLimit))
+    return passed
+
+"""
+testStringSort
+
+This function will run a number of tests of a string sorting algorithm on
+lists of strings, check if the sorting was successful, and print which tests
+failed (if any). The tests focus on the cases that character-by-character
+sorts get wrong: empty strings, strings that are prefixes of other strings,
+and long shared prefixes.
+
+INPUTS
+alg: function pointer for the string sort to test
+    (default = StringSort)
+
+OUTPUTS
+Printed statements indicating which tests passed/failed.
+"""
+def testStringSort(alg = StringSort):
+    # First, we seed the random number generator to ensure reproducibility.
+    random.seed(1)
+
+    # Create lists to store the tests and the test names.
+    tests = []
+    message = []
+
+    # Test 1: empty list
+    tests.append([])
+    message.append('empty list')
+
+    # Test 2: empty strings and prefixes of each other
+    tests.append(['abc', '', 'ab', 'abcd', 'a', '', 'abc', 'b', 'ab'])
+    message.append('empty strings and prefixes')
+
+    # Test 3: all repeated strings
+    tests.append(['spam'] * 40)
+    message.append('all repeated strings')
+
+    # Test 4: descending order
+    tests.append(sorted(['%05d' % x for x in range(100)], reverse=True))
+    message.append('descending order')
+
+    # Test 5: long shared prefix
+    prefix = 'x' * 1000
+    tests.append([prefix + str(random.randrange(50)) for x in range(200)])
+    message.append('long shared prefix')
+
+    # Test 6: random genome reads
+    basePairs = ['A', 'G', 'T', 'C']
+    tests.append([''.join([random.choice(basePairs) \
+                           for y in range(random.randrange(30))]) \
+                  for x in range(300)])
+    message.append('random genome reads')
+
+    # Test 7: non-ASCII characters
+    tests.append(['\u00e9t\u00e9', 'ete', '\u00e9', 'zoo', '\u4e2d\u6587', \
+                  'Zoo', 'e\u0301te'])
+    message.append('non-ASCII characters')
+
+    # Test 8: many repeats of strings that are prefixes of each other
+    words = ['', 'spa', 'spam', 'spammer', 'spamspamspam', 'spas']
+    tests.append([random.choice(words) for x in range(1000)])
+    message.append('many repeated prefixes')
+
+    # Test 9: bytes
+    tests.append([bytes(random.randrange(4) \
+                        for y in range(random.randrange(12))) \
+                  for x in range(500)])
+    message.append('bytes')
+
+    # Sort a copy of each test and check it.
+    def check(tInd):
+        temp = tests[tInd].copy()
+        alg(tests[tInd])
+        return isSorted(temp, tests[tInd])
+
+    runTests(message, check)
+    return
+
+"""
+testSortedList
+
+This function will apply a random stream of operations (add, update with a
+batch, remove, pop, bisect, rank and indexing) to a SortedList and to a
+plain list that is re-sorted after every change, and check after each
+operation that both give the same answers. A small block size is used so
+that blocks are split and joined often. It also times the two ways of
+keeping a sorted view of numBatches batches of values: adding each batch
+to a SortedList, or appending it to a list and re-running MergeSort.
+
+INPUTS
+numOps: the number of random operations to check
+    (default = 20000)
+load: the block size of the SortedList
+    (default = 16)
+numBatches: the number of batches to time
+    (default = 100)
+batchSize: the number of values in each timed batch
+    (default = 100)
+
+OUTPUTS
+Printed statement indicating whether the test passed, also returned as
+True or False.
+"""
+def testSortedList(numOps = 20000, load = 16, numBatches = 100, \
+                   batchSize = 100):
+    # First, we seed the random number generator to ensure reproducibility.
+    random.seed(1)
+
+    sl = SortedList(load=load)
+    ref = []
+    passed = True
+    for op in range(0,numOps):
+        r = random.random()
+        val = random.randrange(1000)
+        if r < 0.4:
+            sl.add(val)
+            ref.append(val)
+        elif r < 0.45:
+            batch = [random.randrange(1000) for x in range(0,50)]
+            sl.update(batch)
+            ref.extend(batch)
+        elif r < 0.6:
+            if val in ref:
+                sl.remove(val)
+                ref.remove(val)
+        elif r < 0.7:
+            if len(ref) > 0:
+                pos = random.randrange(len(ref))
+                passed = passed and sl.pop(pos) == ref.pop(pos)
+        else:
+            passed = passed and sl.bisectLeft(val) == sum(x < val for x in ref)
+            passed = passed and sl.bisectRight(val) == \
+                     sum(x <= val for x in ref)
+            passed = passed and sl.rank(val) == sl.bisectLeft(val)
+            if len(ref) > 0:
+                pos = random.randrange(len(ref))
+                passed = passed and sl[pos] == ref[pos]
+        ref.sort()
+        passed = passed and len(sl) == len(ref)
+    passed = passed and list(sl) == ref
+    runTests(['%d random operations' % numOps], lambda tInd: passed)
+
+    # Time keeping a sorted view of a stream of batches both ways.
+    batches = [[random.random() for x in range(0,batchSize)] \
+               for y in range(0,numBatches)]
+    t = time.perf_counter()
+    sl = SortedList()
+    for batch in batches:
+        sl.update(batch)
+    tSorted = time.perf_counter() - t
+    t = time.perf_counter()
+    values = []
+    for batch in batches:
+        values.extend(batch)
+        MergeSort(values)
+    tResort = time.perf_counter() - t
+    print('%d batches of %d: SortedList %f s, re-sort with MergeSort %f s' \
+          % (numBatches, batchSize, tSorted, tResort))
+    return passed
+
+"""
+testArgSort
+
+This function will build a random table of int, float and string columns,
+sort its rows with LexArgSort by several combinations of columns and sort
+directions (both with packed integer keys and with one pass per column), and
+check each permutation against Python's stable sort. It also checks that
+ArgSort returns a NumPy array for a NumPy column and that Gather reorders a
+column by the permutation.
+
+INPUTS
+n: the number of rows in the table
+    (default = 1000)
+alg: the sorting function passed to LexArgSort
+    (default = MergeSort)
+
+OUTPUTS
+Printed statements indicating which tests passed/failed.
+"""
+def testArgSort(n = 1000, alg = MergeSort):
+    # First, we seed the random number generator to ensure reproducibility.
+    random.seed(1)
+
+    # Build the columns, with many repeated values so that ties matter.
+    ints = array('l', [random.randrange(-10, 10) for x in range(0,n)])
+    reals = [random.randrange(5) / 4 for x in range(0,n)]
+    names = [random.choice(['ann', 'bob', 'cy']) for x in range(0,n)]
+
+    # The column combinations and sort directions to test.
+    tests = [([ints], False), ([reals], True), ([names], False), \
+             ([ints, reals], [False, True]), ([names, ints], [True, False]), \
+             ([reals, names, ints], False)]
+
+    message = ['%d column(s)' % len(columns) for columns, reverse in tests]
+    message.append('NumPy column and Gather')
+
+    def check(tInd):
+        # NumPy input gives NumPy output, and Gather follows the permutation.
+        if tInd == len(tests):
+            column = numpy.array(reals)
+            perm = ArgSort(column, alg)
+            return isinstance(perm, numpy.ndarray) and \
+                   Gather(column, perm).tolist() == sorted(reals) and \
+                   Gather(names, perm) == [names[i] for i in perm]
+
+        columns, reverse = tests[tInd]
+        perm = LexArgSort(columns, alg, reverse)
+
+        # Python's stable sort, one pass per column from the last.
+        directions = reverse if isinstance(reverse, list) else \
+                     [reverse] * len(columns)
+        expected = list(range(n))
+        for column, rev in zip(reversed(columns), reversed(directions)):
+            expected.sort(key=lambda i: column[i], reverse=rev)
+        return list(perm) == expected
+
+    runTests(message, check)
+    return
+
+"""
+testBufferSort
+
+This function will sort several kinds of writable buffers in place with
+BufferSort: an array.array of ints and of floats, a memoryview of part of
+an array, a 2-D NumPy array, a bytearray read as unsigned shorts, and an
+mmap of a temporary file of int64 records. Each buffer is checked against
+Python's sort, and the values outside a sorted memoryview must not move.
+A buffer with a multi-character format (big-endian shorts) must be refused.
+
+INPUTS
+n: the number of values in each buffer
+    (default = 10000)
+alg: the sort passed to BufferSort, QuickSort or HeapSort, or None for the
+    NumPy fast path
+    (default = None)
+
+OUTPUTS
+Printed statements indicating which tests passed/failed.
+"""
+def testBufferSort(n = 10000, alg = None):
+    # First, we seed the random number generator to ensure reproducibility.
+    random.seed(1)
+    values = [random.randint(-2**40, 2**40) for x in range(0,n)]
+    shorts = [x % 2**16 for x in values]
+
+    # Create lists to store the test names and results.
+    message = []
+    results = []
+
+    # Test 1: array of int64
+    buf = array('q', values)
+    BufferSort(buf, alg=alg)
+    message.append('array of int64')
+    results.append(buf.tolist() == sorted(values))
+
+    # Test 2: array of doubles
+    buf = array('d', [x / 3 for x in values])
+    BufferSort(buf, alg=alg)
+    message.append('array of doubles')
+    results.append(buf.tolist() == sorted([x / 3 for x in values]))
+
+    # Test 3: memoryview of the middle of an array
+    buf = array('q', values)
+    BufferSort(memoryview(buf)[n//4:n//2], alg=alg)
+    message.append('memoryview of part of an array')
+    results.append(buf[n//4:n//2].tolist() == sorted(values[n//4:n//2]) and \
+                   buf[:n//4].tolist() == values[:n//4] and \
+                   buf[n//2:].tolist() == values[n//2:])
+
+    # Test 4: 2-D NumPy array, sorted as one flat buffer
+    buf = numpy.array(values[:n - n % 10]).reshape(10, -1)
+    BufferSort(buf, alg=alg)
+    message.append('2-D NumPy array')
+    results.append(buf.ravel().tolist() == sorted(values[:n - n % 10]))
+
+    # Test 5: bytearray read as unsigned shorts
+    buf = bytearray(array('H', shorts).tobytes())
+    BufferSort(buf, 'H', alg)
+    message.append('bytearray of unsigned shorts')
+    results.append(array('H', buf).tolist() == sorted(shorts))
+
+    # Test 6: mmap of a file of int64 records
+    with tempfile.TemporaryFile() as f:
+        array('q', values).tofile(f)
+        f.flush()
+        with mmap.mmap(f.fileno(), 0) as buf:
+            BufferSort(buf, 'q', alg)
+            sortedRecords = array('q')
+            sortedRecords.frombytes(buf[:])
+    message.append('mmap of int64 records')
+    results.append(sortedRecords.tolist() == sorted(values))
+
+    # Test 7: big-endian shorts have the format '>H', which is not a typecode
+    buf = numpy.array(shorts, dtype='>u2')
+    try:
+        BufferSort(buf, alg=alg)
+        refused = False
+    except Exception:
+        refused = True
+    message.append('refuses format %r' % memoryview(buf).format)
+    results.append(refused and buf.tolist() == shorts)
+
+    # Print the results.
+    runTests(message, lambda tInd: results[tInd])
+    return
+
+"""
+testBatchSort
+
+This function will sort batches of short rows with BatchSort and check each
+row against NumPy's stable argsort. The rows have mixed lengths, widths that
+are not all powers of two (1, 7, 33 and 64), many duplicate values, and
+values equal to the largest int64 (the same value used for the padding).
+Bool and float rows and full rows (no lengths) are tested as well. For each
+row, the first lengths[r] entries must match the stable sort of the real
+values and perm must match the argsort, while the padding must stay at the
+end of the row in its original order.
+
+INPUTS
+numRows: the number of rows in each batch
+    (default = 500)
+
+OUTPUTS
+Printed statements indicating which tests passed/failed.
+"""
+def testBatchSort(numRows = 500):
+    # First, we seed the random number generator to ensure reproducibility.
+    random.seed(1)
+    intMax = numpy.iinfo(numpy.int64).max
+
+    # Build the batches as (description, values, lengths).
+    tests = []
+    for width in [1, 7, 33, 64]:
+        values = numpy.array([[random.randrange(-5, 5) for c in range(width)] \
+                              for r in range(numRows)], dtype=numpy.int64)
+        lengths = [random.randint(0, width) for r in range(numRows)]
+        tests.append(('width %d ints with duplicates' % width, values, \
+                      lengths))
+    values = numpy.array([[random.choice([intMax, -intMax, 0]) \
+                           for c in range(33)] for r in range(numRows)], \
+                         dtype=numpy.int64)
+    lengths = [random.randint(0, 33) for r in range(numRows)]
+    tests.append(('width 33 ints with int64 max values', values, lengths))
+    values = numpy.array([[random.random() < 0.5 for c in range(7)] \
+                          for r in range(numRows)])
+    lengths = [random.randint(0, 7) for r in range(numRows)]
+    tests.append(('width 7 bools', values, lengths))
+    values = numpy.array([[random.randrange(4) / 4 for c in range(33)] \
+                          for r in range(numRows)])
+    lengths = [random.randint(0, 33) for r in range(numRows)]
+    tests.append(('width 33 floats', values, lengths))
+    values = numpy.array([[random.randrange(-5, 5) for c in range(64)] \
+                          for r in range(numRows)])
+    tests.append(('width 64 full rows', values, None))
+
+    def check(tInd):
+        name, values, lengths = tests[tInd]
+        sortedValues, perm = BatchSort(values, lengths)
+        width = values.shape[1]
+        for r in range(0,numRows):
+            n = width if lengths is None else lengths[r]
+            order = numpy.argsort(values[r,:n], kind='stable')
+            if not (numpy.array_equal(sortedValues[r,:n], values[r,:n][order])
+                    and numpy.array_equal(perm[r,:n], order) and \
+                    numpy.array_equal(sortedValues[r,n:], values[r,n:]) and \
+                    numpy.array_equal(perm[r,n:], numpy.arange(n, width))):
+                return False
+        return True
+
+    runTests([name for name, values, lengths in tests], check)
+    return
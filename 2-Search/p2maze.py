@@ -6,8 +6,9 @@ Fall 2021
 p2Maze.py
 """
 
-# Import math, other p2 files, plotting, and Wilson's.
+# Import math, typed arrays, other p2 files, plotting, and Wilson's.
 import math
+from array import array
 from project2 import bdfs
 import matplotlib.pyplot as plt
 from matplotlib import cm
@@ -66,15 +67,20 @@ class Maze:
     """
     Class attributes:
 
-    maze    # The 2D list representing the maze.
-    adjList # The adjacency list of Vertex objects.
-    adjMat  # The adjacency matrix, 2D list.
-    start   # The start Vertex object.
-    exit    # The exit Vertex object.
-    path    # The path from start to exit, list of ranks.
-    verb    # A flag to control printing. False prints less.
+    maze     # The 2D list representing the maze.
+    adjList  # The adjacency list of Vertex objects.
+    adjMat   # The adjacency matrix, 2D list, built on first use (see below).
+    start    # The start Vertex object.
+    exit     # The exit Vertex object.
+    path     # The path from start to exit, list of ranks.
+    verb     # A flag to control printing. False prints less.
+    compact  # False here, True for the array-backed CompactMaze.
+    expanded # The number of vertices expanded by the last search.
     """
 
+    # Vertex objects, not arrays (see CompactMaze).
+    compact = False
+
     """
     __init__ function to initialize the maze.
 
@@ -93,8 +99,10 @@ class Maze:
         self.adjList = [Vertex(r) for r in \
                         range(0,len(self.maze)*len(self.maze[0]))]
 
-        # Initialize the adjacency matrix to have no edges yet.
-        self.adjMat = [[0 for x in self.adjList] for y in self.adjList]
+        # The dense adjacency matrix is not built here: it has V^2 entries,
+        # and the neighbor lists and isNeighbor answer the same questions
+        # from the grid. It is only built if self.adjMat is used.
+        self.denseAdjMat = None
 
         # Now loop through the maze and update adjacencies.
         # In this loop, maze[r][c] will correspond to vertex rank:
@@ -111,30 +119,18 @@ class Maze:
                         # Append the neighbor to the neigh list.
                         self.adjList[r*len(self.maze[0])+c].neigh.append(\
                             self.adjList[(r-1)*len(self.maze[0])+c])
-
-                        # Update the correct entry in the adjMat.
-                        self.adjMat[r*len(self.maze[0])+c]\
-                                   [(r-1)*len(self.maze[0])+c] = 1
                         
                     # If down is open, it is a neighbor.
                     if self.maze[r+1][c] == 0:
                         # Append the neighbor to the neigh list.
                         self.adjList[r*len(self.maze[0])+c].neigh.append(\
                             self.adjList[(r+1)*len(self.maze[0])+c])
-
-                        # Update the correct entry in the adjMat.
-                        self.adjMat[r*len(self.maze[0])+c]\
-                                   [(r+1)*len(self.maze[0])+c] = 1
                         
                     # If left is open, it is a neighbor.
                     if self.maze[r][c-1] == 0:
                         # Append the neighbor to the neigh list.
                         self.adjList[r*len(self.maze[0])+c].neigh.append(\
                             self.adjList[r*len(self.maze[0])+c-1])
-
-                        # Update the correct entry in the adjMat.
-                        self.adjMat[r*len(self.maze[0])+c]\
-                                   [r*len(self.maze[0])+c-1] = 1
                         
                     # If right is open, it is a neighbor.
                     if self.maze[r][c+1] == 0:
@@ -142,18 +138,13 @@ class Maze:
                         self.adjList[r*len(self.maze[0])+c].neigh.append(\
                             self.adjList[r*len(self.maze[0])+c+1])
 
-                        # Update the correct entry in the adjMat.
-                        self.adjMat[r*len(self.maze[0])+c]\
-                                   [r*len(self.maze[0])+c+1] = 1
-
         # Find the start in the top row and exit in the bottom row.
-        # Update their info in the adjList and adjMat.
+        # Update their info in the adjList.
         # Note: start's only neighbor is down and exit's is up.
         for ind in range(0,len(self.maze[0])):
             if self.maze[0][ind] == 0:
                 self.start = self.adjList[ind]
                 self.start.neigh = [self.adjList[ind + len(self.maze[0])]]
-                self.adjMat[ind][ind + len(self.maze[0])] = 1
                 break
         for ind in range(0,len(self.maze[len(self.maze)-1])):
             if self.maze[len(self.maze)-1][ind] == 0:
@@ -161,17 +152,68 @@ class Maze:
                     self.adjList[ind + (len(self.maze)-1)*len(self.maze[0])]
                 self.exit.neigh = [self.adjList[ind + \
                                    (len(self.maze)-2)*len(self.maze[0])]]
-                self.adjMat[self.exit.rank]\
-                           [self.exit.rank - len(self.maze[0])] = 1
                 break
 
         # Set the path to be empty.
         self.path = []
+        self.expanded = 0
 
         # Set verbosity.
         self.verb = verbosity
         return
 
+    """
+    neighbors function to return the list of ranks of the neighbors of the
+    vertex of rank v.
+    """
+    def neighbors(self, v):
+        return [vertex.rank for vertex in self.adjList[v].neigh]
+
+    """
+    adjMat property to return the adjacency matrix, a 2D list where
+    adjMat[a][b] is 1 if b is a neighbor of a and 0 otherwise.
+    Note: the matrix is built from the adjList the first time it is used,
+    and takes O(V^2) time and memory. Use isNeighbor for single checks.
+    """
+    @property
+    def adjMat(self):
+        if self.denseAdjMat is None:
+            self.denseAdjMat = [[0 for x in self.adjList] \
+                                for y in self.adjList]
+            for vertex in self.adjList:
+                for neighbor in vertex.neigh:
+                    self.denseAdjMat[vertex.rank][neighbor.rank] = 1
+        return self.denseAdjMat
+
+    """
+    isNeighbor function to check in O(1) from the grid whether the vertex of
+    rank b is a neighbor of the vertex of rank a, i.e. whether
+    adjMat[a][b] == 1.
+
+    Two open cells that share a side are neighbors, as long as a is inside
+    the outer wall. The start and exit, which are in the outer wall, are
+    only neighbors of the cell below and above them, respectively.
+    """
+    def isNeighbor(self, a, b):
+        numCols = len(self.maze[0])
+        (ra, ca) = divmod(a, numCols)
+        (rb, cb) = divmod(b, numCols)
+
+        # Both cells must be open and share a side.
+        if abs(ra-rb) + abs(ca-cb) != 1:
+            return False
+        if self.maze[ra][ca] != 0 or self.maze[rb][cb] != 0:
+            return False
+
+        # The start and exit only lead into the maze.
+        if a == self.start.rank:
+            return b == a + numCols
+        if a == self.exit.rank:
+            return b == a - numCols
+
+        # Otherwise a must be inside the outer wall.
+        return 0 < ra < len(self.maze)-1 and 0 < ca < numCols-1
+
     """
     __repr__ function to print the maze.
     """
@@ -262,7 +304,7 @@ class Maze:
             # Loop through the path to make sure that each neighbor is actually
             # a neighbor...
             for vInd in range(0,len(self.path)-1):
-                if (self.adjMat[self.path[vInd]][self.path[vInd+1]] != 1) \
+                if (not self.isNeighbor(self.path[vInd], self.path[vInd+1])) \
                    and (self.path[vInd] != self.path[vInd+1]):
                     warn += 'Not a neighbor! You cannot teleport!\n'
                     invalid = True
@@ -351,10 +393,158 @@ class Maze:
             print('Maze not solved!\n')
         self.verb = verbosity
         print(self)
+        print('Vertices expanded: %d\n' % self.expanded)
         self.plot_maze_solution(plotting)
         return
 
 ################################################################################
+
+"""
+CompactMaze Class
+
+A Maze stored as a struct of arrays instead of one Vertex object per cell.
+The grid is a bytearray with one byte per cell (0 open, 1 wall), indexed by
+rank = r*numCols + c, and self.maze is a 2D NumPy uint8 view of the same
+bytes, so printMaze and isNeighbor work unchanged. The search state of each
+cell lives in typed arrays indexed by rank: visited (a bytearray), dist and
+prev (int32 arrays, -1 for none). Neighbors are computed from the grid when
+needed, in the same order as the Maze neighbor lists. This takes 10 bytes
+per cell, instead of the hundreds of bytes of a Vertex object, its __dict__,
+its neighbor list and a row of adjMat.
+
+bdfs runs directly on the arrays of a CompactMaze; adjList is None.
+"""
+class CompactMaze(Maze):
+
+    """
+    Class attributes (in addition to those of Maze):
+
+    grid    # The bytearray of cells, 0 for open and 1 for wall.
+    numRows # The number of rows of the grid.
+    numCols # The number of columns of the grid.
+    visited # The bytearray of visited flags, by rank.
+    dist    # The int32 array of distances from start, by rank.
+    prev    # The int32 array of previous ranks on the path, by rank.
+    """
+
+    # Arrays, not Vertex objects.
+    compact = True
+
+    """
+    __init__ function to initialize the maze.
+
+    INPUTS
+    mazeNum:   which maze to select.
+    verbosity: a flag to control printing, where False prints less.
+    numRooms:  if mazeNum=5, then set the size of the maze, which will
+               be 2*numRooms+1.
+    """
+    def __init__(self, mazeNum=0, verbosity=False, numRooms=12):
+
+        # Pack the selected maze into one byte per cell.
+        rows = getMaze(mazeNum, numRooms)
+        self.numRows = len(rows)
+        self.numCols = len(rows[0])
+        self.grid = bytearray(cell for row in rows for cell in row)
+        del rows
+        self.maze = np.frombuffer(self.grid, dtype=np.uint8)\
+                      .reshape(self.numRows, self.numCols)
+
+        # There are no Vertex objects and no adjacency matrix.
+        self.adjList = None
+        self.denseAdjMat = None
+
+        # Find the start in the top row and exit in the bottom row.
+        # Only their ranks are used, so they are stand-alone Vertex objects.
+        bottom = (self.numRows-1)*self.numCols
+        self.start = Vertex(self.grid.index(0, 0, self.numCols))
+        self.exit = Vertex(self.grid.index(0, bottom, bottom + self.numCols))
+
+        # Create the search state arrays.
+        numCells = self.numRows*self.numCols
+        self.visited = bytearray(numCells)
+        self.dist = array('i', [-1])*numCells
+        self.prev = array('i', [-1])*numCells
+
+        # Set the path to be empty.
+        self.path = []
+        self.expanded = 0
+
+        # Set verbosity.
+        self.verb = verbosity
+        return
+
+    """
+    neighbors function to return the list of ranks of the neighbors of the
+    cell of rank v, in the order up, down, left, right.
+    Note: the start's only neighbor is down and the exit's is up.
+    """
+    def neighbors(self, v):
+        grid = self.grid
+        numCols = self.numCols
+        if v == self.start.rank:
+            return [v + numCols]
+        if v == self.exit.rank:
+            return [v - numCols]
+
+        # Walls and cells in the outer wall have no neighbors.
+        (r, c) = divmod(v, numCols)
+        if grid[v] != 0 or r == 0 or r == self.numRows-1 or \
+           c == 0 or c == numCols-1:
+            return []
+        neigh = []
+        if grid[v-numCols] == 0:
+            neigh.append(v-numCols)
+        if grid[v+numCols] == 0:
+            neigh.append(v+numCols)
+        if grid[v-1] == 0:
+            neigh.append(v-1)
+        if grid[v+1] == 0:
+            neigh.append(v+1)
+        return neigh
+
+    """
+    reset function to clear the path and the search state arrays.
+    """
+    def reset(self):
+        numCells = len(self.grid)
+        self.path = []
+        self.visited = bytearray(numCells)
+        self.dist = array('i', [-1])*numCells
+        self.prev = array('i', [-1])*numCells
+        return
+
+    """
+    adjMat property to return the adjacency matrix, built from neighbors
+    the first time it is used.
+    Note: this takes O(V^2) time and memory.
+    """
+    @property
+    def adjMat(self):
+        if self.denseAdjMat is None:
+            numCells = len(self.grid)
+            self.denseAdjMat = [[0 for x in range(numCells)] \
+                                for y in range(numCells)]
+            for v in range(numCells):
+                for u in self.neighbors(v):
+                    self.denseAdjMat[v][u] = 1
+        return self.denseAdjMat
+
+    """
+    printList function for cleanly printing the neighbors of each cell.
+    Note: skips cells with no neighbors.
+    """
+    def printList(self):
+        for v in range(len(self.grid)):
+            neigh = self.neighbors(v)
+            if len(neigh) > 0:
+                print('Rank: %d' % v)
+                print('Neighbors:')
+                print(neigh)
+                print('')
+        return
+
+################################################################################
     
 """
 getMaze function will provide the 2D array representing the maze to the Maze
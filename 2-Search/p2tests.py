@@ -6,8 +6,10 @@ Fall 2021
 p2tests.py
 """
 
-# Import math and other p2 files.
+# Import math, random, time, and other p2 files.
 import math
+import random
+import time
 from p2stack import *
 from p2queue import *
 from p2maze import *
@@ -21,27 +23,163 @@ def testMazes(verbosity=False):
     m.solve('DFS',verbosity,False)
     print('Testing Maze 0, BFS')
     m.solve('BFS',verbosity,False)
+    print('Testing Maze 0, BIBFS')
+    m.solve('BIBFS',verbosity,False)
+    print('Testing Maze 0, ASTAR')
+    m.solve('ASTAR',verbosity,False)
+    print('Testing Maze 0, JPS')
+    m.solve('JPS',verbosity,False)
     m = Maze(1,verbosity)
     print('Testing Maze 1, DFS')
     m.solve('DFS',verbosity,False)
     print('Testing Maze 1, BFS')
     m.solve('BFS',verbosity,False)
+    print('Testing Maze 1, BIBFS')
+    m.solve('BIBFS',verbosity,False)
+    print('Testing Maze 1, ASTAR')
+    m.solve('ASTAR',verbosity,False)
+    print('Testing Maze 1, JPS')
+    m.solve('JPS',verbosity,False)
     m = Maze(2,verbosity)
     print('Testing Maze 2, DFS')
     m.solve('DFS',verbosity,False)
     print('Testing Maze 2, BFS')
     m.solve('BFS',verbosity,False)
+    print('Testing Maze 2, BIBFS')
+    m.solve('BIBFS',verbosity,False)
+    print('Testing Maze 2, ASTAR')
+    m.solve('ASTAR',verbosity,False)
+    print('Testing Maze 2, JPS')
+    m.solve('JPS',verbosity,False)
     m = Maze(3,verbosity)
     print('Testing Maze 3, DFS')
     m.solve('DFS',verbosity,False)
     print('Testing Maze 3, BFS')
     m.solve('BFS',verbosity,False)
+    print('Testing Maze 3, BIBFS')
+    m.solve('BIBFS',verbosity,False)
+    print('Testing Maze 3, ASTAR')
+    m.solve('ASTAR',verbosity,False)
+    print('Testing Maze 3, JPS')
+    m.solve('JPS',verbosity,False)
     m = Maze(4,verbosity)
     print('Testing Maze 4, DFS')
     m.solve('DFS',verbosity,False)
     print('Testing Maze 4, BFS')
     m.solve('BFS',verbosity,False)
+    print('Testing Maze 4, BIBFS')
+    m.solve('BIBFS',verbosity,False)
+    print('Testing Maze 4, ASTAR')
+    m.solve('ASTAR',verbosity,False)
+    print('Testing Maze 4, JPS')
+    m.solve('JPS',verbosity,False)
     plt.show()
     return
 
+"""
+testLargeMaze function will solve a random maze that is too large for a
+dense adjacency matrix (V^2 entries), and check the path with printMaze.
+Set compact to True to use the array-backed CompactMaze.
+"""
+def testLargeMaze(numRooms=150, alg='BFS', seed=1, compact=False):
+    random.seed(seed)
+    if compact:
+        m = CompactMaze(5,False,numRooms)
+    else:
+        m = Maze(5,False,numRooms)
+    print('Testing random %dx%d maze, %s' % (len(m.maze),len(m.maze[0]),alg))
+    m.solve(alg,False,False)
+    return
+
+"""
+compareExpanded function will solve trials random mazes with each of the
+input algs and print the average number of vertices each alg expanded and
+pushed, and the average wall-clock seconds it took. All of the algs must find
+paths of the same length, which is checked.
+"""
+def compareExpanded(numRooms=100, trials=5, \
+                    algs=['BFS','BIBFS','ASTAR','JPS'], seed=1):
+    random.seed(seed)
+    totals = [0 for alg in algs]
+    pushes = [0 for alg in algs]
+    seconds = [0 for alg in algs]
+    for trial in range(0,trials):
+        m = CompactMaze(5,False,numRooms)
+        lengths = []
+        for aInd in range(0,len(algs)):
+            start = time.perf_counter()
+            lengths.append(len(bdfs(m,algs[aInd])))
+            seconds[aInd] += time.perf_counter() - start
+            totals[aInd] += m.expanded
+            pushes[aInd] += m.pushed
+        if min(lengths) != max(lengths):
+            print('Path lengths differ: %s' % lengths)
+    print('Average vertices expanded/pushed and seconds on %d random %dx%d ' \
+          'mazes:' % (trials,2*numRooms+1,2*numRooms+1))
+    for aInd in range(0,len(algs)):
+        print('    %-6s %10.1f %10.1f %10.4f' % (algs[aInd], \
+              totals[aInd]/trials,pushes[aInd]/trials,seconds[aInd]/trials))
+    return
+
+"""
+compareGrowth function will run compareExpanded on random mazes of increasing
+numRooms, to show how the number of vertices expanded by each alg grows with
+the size of the maze.
+"""
+def compareGrowth(roomCounts=[10,20,40,80,160], trials=3, \
+                  algs=['BFS','BIBFS','ASTAR','JPS']):
+    for numRooms in roomCounts:
+        compareExpanded(numRooms,trials,algs)
+    return
+
+"""
+openRoomMaze function will create a CompactMaze of size 2*numRooms+1 whose
+inside is one open room, with the start and exit of a random maze.
+"""
+def openRoomMaze(numRooms=100):
+    m = CompactMaze(5,False,numRooms)
+    for r in range(1,m.numRows-1):
+        for c in range(1,m.numCols-1):
+            m.grid[r*m.numCols+c] = 0
+    return m
+
+"""
+corridorMaze function will create a CompactMaze of size 2*numRooms+1 that
+is one long corridor winding back and forth, like getMaze(3).
+"""
+def corridorMaze(numRooms=100):
+    m = CompactMaze(5,False,numRooms)
+    for r in range(1,m.numRows-1):
+        for c in range(1,m.numCols-1):
+            if r % 2 == 1:
+                # Open corridor row.
+                m.grid[r*m.numCols+c] = 0
+            elif r % 4 == 2:
+                # Wall row with a gap at the right end.
+                m.grid[r*m.numCols+c] = 0 if c == m.numCols-2 else 1
+            else:
+                # Wall row with a gap at the left end.
+                m.grid[r*m.numCols+c] = 0 if c == 1 else 1
+    return m
+
+"""
+comparePushes function will solve open-room and corridor mazes of increasing
+numRooms with each of the input algs and print the number of vertices each
+alg pushed onto its stack, queue or heap, the path length, and the wall-clock
+seconds it took.
+"""
+def comparePushes(roomCounts=[25,100,200], algs=['BFS','ASTAR','JPS']):
+    for makeMaze in [openRoomMaze, corridorMaze]:
+        for numRooms in roomCounts:
+            random.seed(1)
+            m = makeMaze(numRooms)
+            print('%s, %dx%d:' % (makeMaze.__name__,m.numRows,m.numCols))
+            for alg in algs:
+                start = time.perf_counter()
+                length = len(bdfs(m,alg))
+                seconds = time.perf_counter() - start
+                print('    %-6s pushed %8d   path length %6d   %8.4f s' \
+                      % (alg,m.pushed,length,seconds))
+    return
+
 ################################################################################
@@ -1,5 +1,7 @@
-# Import math and other p2 files.
+# Import math, typed arrays, a binary heap, and other p2 files.
 import math
+import heapq
+from array import array
 from p2tests import *
 
 """
@@ -10,9 +12,13 @@ maze: A Maze object representing the maze
 
 There is no explicit return value. The input will be "reset" to have
 an empty path and all vertices set such that vert.prev = None, 
-vert.dist = None, and vert.visited = False
+vert.dist = None, and vert.visited = False (for a CompactMaze, the
+prev, dist and visited arrays are cleared instead)
 """
 def resetMaze(maze):
+    if maze.compact:
+        maze.reset()
+        return
     maze.path = []
     for vert in maze.adjList:
         vert.prev = None
@@ -25,19 +31,34 @@ BFS/DFS function
 
 INPUTS
 maze: A Maze object representing the maze.
-alg:  A string that is either 'BFS' or 'DFS'.
+alg:  A string that is either 'BFS', 'DFS', 'BIBFS' (bidirectional BFS),
+      'ASTAR' (A* search) or 'JPS' (jump point search).
 
 OUTPUTS
 path: The path from maze.start to maze.exit.
+
+The number of vertices expanded (taken from the storage and their neighbors
+examined) is stored in maze.expanded, and the number of pushes onto the
+storage (stack, queue, frontier or heap) in maze.pushed.
 """
 def bdfs(maze, alg):
-    # If the alg is not BFS or DFS, raise exception.
-    if (alg != 'BFS') and (alg != 'DFS'):
-        raise Exception('Incorrect alg! Need BFS or DFS!')
+    # If the alg is not BFS, DFS, BIBFS, ASTAR or JPS, raise exception.
+    if alg not in ['BFS', 'DFS', 'BIBFS', 'ASTAR', 'JPS']:
+        raise Exception('Incorrect alg! Need BFS, DFS, BIBFS, ASTAR or JPS!')
 
     # Reset maze if it has already been solved
     if len(maze.path) > 0:
         resetMaze(maze)
+    maze.expanded = 0
+    maze.pushed = 0
+
+    # Bidirectional BFS, A* and JPS work on ranks for both kinds of maze
+    if alg == 'BIBFS':
+        return bibfs(maze)
+    if alg == 'ASTAR':
+        return astar(maze)
+    if alg == 'JPS':
+        return jps(maze)
 
     # Initialize appropriate data structure based on algorithm choice
     if alg == 'DFS':
@@ -45,18 +66,25 @@ def bdfs(maze, alg):
     else:
         storage = Queue()
 
+    # A CompactMaze has arrays instead of Vertex objects
+    if maze.compact:
+        return bdfsCompact(maze, storage)
+
     # Push start into storage and update start attributes
     maze.start.visited = True
     maze.start.dist = 0
     storage.push(maze.start)
+    maze.pushed += 1
 
     # Search until the exit is found
     exit_found = False
     while not exit_found:
         current = storage.pop()
+        maze.expanded += 1
         for neighbor in current.neigh:
             if not neighbor.visited: 
                 storage.push(neighbor)
+                maze.pushed += 1
                 neighbor.visited = True
                 neighbor.dist = current.dist + 1
                 neighbor.prev = current
@@ -79,6 +107,464 @@ def bdfs(maze, alg):
 
     return maze.path
 
+"""
+bdfsCompact function
+
+The same search as bdfs, run on the arrays of a CompactMaze: vertices are
+ranks, neighbors come from maze.neighbors, and the visited flag, distance
+and previous rank of each vertex are stored in maze.visited, maze.dist and
+maze.prev. The path found is the same as bdfs finds on the equivalent Maze.
+
+INPUTS
+maze:    A CompactMaze object representing the maze.
+storage: An empty Stack (for DFS) or Queue (for BFS).
+
+OUTPUTS
+path: The path from maze.start to maze.exit.
+"""
+def bdfsCompact(maze, storage):
+    start = maze.start.rank
+    exit = maze.exit.rank
+    visited = maze.visited
+    dist = maze.dist
+    prev = maze.prev
+
+    # Push start into storage and update start attributes
+    visited[start] = 1
+    dist[start] = 0
+    storage.push(start)
+    maze.pushed += 1
+
+    # Search until the exit is found
+    exit_found = False
+    while not exit_found:
+        current = storage.pop()
+        maze.expanded += 1
+        for neighbor in maze.neighbors(current):
+            if not visited[neighbor]:
+                storage.push(neighbor)
+                maze.pushed += 1
+                visited[neighbor] = 1
+                dist[neighbor] = dist[current] + 1
+                prev[neighbor] = current
+            # Stop searching when the exit is found
+            if neighbor == exit:
+                exit_found = True
+                current = neighbor
+                break
+
+    # Follow prev from the exit back to the start, then reverse
+    maze.path = [current]
+    while current != start:
+        current = prev[current]
+        maze.path.append(current)
+    maze.path = maze.path[::-1]
+
+    return maze.path
+
+"""
+bibfs function
+
+Bidirectional BFS: one BFS grows from maze.start and another from
+maze.exit, a whole level at a time, and the side whose frontier is smaller
+is always the one grown next. As soon as a vertex is reached by both
+searches, the path is stitched together there: the start search's prev
+links lead back to the start, and the exit search's prev links lead on to
+the exit. Every vertex reached by the other search at that point has the
+same distance from it, so the path is a shortest path, as for BFS. On a
+maze whose start and exit are far apart, each search only needs to reach
+about half as far as a single BFS.
+
+INPUTS
+maze: A Maze or CompactMaze object representing the maze.
+
+OUTPUTS
+path: The path from maze.start to maze.exit, or an empty list if there is
+      none.
+"""
+def bibfs(maze):
+    start = maze.start.rank
+    exit = maze.exit.rank
+
+    # prev links of each search by rank, -1 if not reached by that search
+    numCells = len(maze.maze)*len(maze.maze[0])
+    prevStart = array('i', [-1])*numCells
+    prevExit = array('i', [-1])*numCells
+    prevStart[start] = start
+    prevExit[exit] = exit
+    frontStart = [start]
+    frontExit = [exit]
+    maze.pushed += 2
+
+    # Grow the smaller frontier by one level until the searches meet
+    meet = -1
+    while meet < 0 and len(frontStart) > 0 and len(frontExit) > 0:
+        if len(frontStart) <= len(frontExit):
+            (front, prev, other) = (frontStart, prevStart, prevExit)
+        else:
+            (front, prev, other) = (frontExit, prevExit, prevStart)
+        nextFront = []
+        for current in front:
+            maze.expanded += 1
+            for neighbor in maze.neighbors(current):
+                if prev[neighbor] < 0:
+                    prev[neighbor] = current
+                    nextFront.append(neighbor)
+                    maze.pushed += 1
+                    # Stop when the other search has reached this vertex
+                    if other[neighbor] >= 0:
+                        meet = neighbor
+                        break
+            if meet >= 0:
+                break
+        if front is frontStart:
+            frontStart = nextFront
+        else:
+            frontExit = nextFront
+
+    # No path if one of the searches ran out of vertices
+    if meet < 0:
+        return []
+
+    # Stitch the path: start ... meet, then meet ... exit
+    current = meet
+    maze.path = [current]
+    while current != start:
+        current = prevStart[current]
+        maze.path.append(current)
+    maze.path = maze.path[::-1]
+    current = meet
+    while current != exit:
+        current = prevExit[current]
+        maze.path.append(current)
+
+    return maze.path
+
+"""
+astar function
+
+A* search: vertices are expanded in order of f = g + h, where g is the
+length of the best path found so far from the start and h is the Manhattan
+distance (in rows plus columns of the grid) to the exit. The open vertices
+are kept in a binary heap (heapq) of (f, -g, rank) entries, so that among
+vertices with equal f the one with larger g, i.e. closer to the exit, is
+expanded first. A vertex whose g improves is pushed again, and outdated
+heap entries are skipped when popped. Each move changes the Manhattan
+distance by at most 1, so h never overestimates and never drops by more
+than the cost of a move, and the path is a shortest path, as for BFS.
+
+INPUTS
+maze: A Maze or CompactMaze object representing the maze.
+
+OUTPUTS
+path: The path from maze.start to maze.exit, or an empty list if there is
+      none.
+"""
+def astar(maze):
+    start = maze.start.rank
+    exit = maze.exit.rank
+    numCols = len(maze.maze[0])
+    (exitRow, exitCol) = divmod(exit, numCols)
+
+    # Best known g and prev link of each rank, -1 if not reached yet
+    numCells = len(maze.maze)*numCols
+    g = array('i', [-1])*numCells
+    prev = array('i', [-1])*numCells
+    closed = bytearray(numCells)
+
+    # Start with only the start in the heap
+    (r, c) = divmod(start, numCols)
+    g[start] = 0
+    heap = [(abs(r-exitRow) + abs(c-exitCol), 0, start)]
+    maze.pushed += 1
+
+    # Expand the vertex with the smallest f until the exit is expanded
+    found = False
+    while len(heap) > 0:
+        (f, negG, current) = heapq.heappop(heap)
+        # Skip outdated entries of vertices already expanded
+        if closed[current]:
+            continue
+        closed[current] = 1
+        maze.expanded += 1
+        if current == exit:
+            found = True
+            break
+        for neighbor in maze.neighbors(current):
+            newG = g[current] + 1
+            if not closed[neighbor] and (g[neighbor] < 0 or \
+                                         newG < g[neighbor]):
+                g[neighbor] = newG
+                prev[neighbor] = current
+                (r, c) = divmod(neighbor, numCols)
+                h = abs(r-exitRow) + abs(c-exitCol)
+                heapq.heappush(heap, (newG + h, -newG, neighbor))
+                maze.pushed += 1
+
+    # No path if the heap ran out first
+    if not found:
+        return []
+
+    # Follow prev from the exit back to the start, then reverse
+    current = exit
+    maze.path = [current]
+    while current != start:
+        current = prev[current]
+        maze.path.append(current)
+    maze.path = maze.path[::-1]
+
+    return maze.path
+
+"""
+jps function
+
+Jump point search (JPS) for a 4-connected grid: A* over jump points only.
+Among the shortest paths, it only looks for ones that make a vertical move
+as early as possible, i.e. that never move sideways and then up or down if
+they could have moved up or down first. Such a path can turn from vertical
+to horizontal anywhere, but from horizontal to vertical only at a forced
+neighbor: an open cell above (or below) whose counterpart behind it is
+blocked, as at the end of a wall. There is always a shortest path of this
+kind, because swapping a sideways move and the vertical move after it keeps
+the length.
+
+So a horizontal jump runs along a row, without pushing anything, until it
+reaches the exit or a cell with a forced neighbor; and a vertical jump runs
+along a column until it reaches the exit or a cell from which a horizontal
+jump finds a jump point. Only the cells where jumps stop are pushed onto the
+heap, keyed by f = g + h with the Manhattan distance h and ties broken
+toward larger g, as in astar. Heap states are (cell, direction) pairs,
+since the direction of arrival decides which way the search can go next.
+The full path is rebuilt by filling in the straight runs between
+consecutive jump points.
+
+INPUTS
+maze: A Maze or CompactMaze object representing the maze.
+
+OUTPUTS
+path: The path from maze.start to maze.exit, or an empty list if there is
+      none.
+"""
+def jps(maze):
+    start = maze.start.rank
+    exit = maze.exit.rank
+    grid = jpsGrid(maze)
+    numCols = len(maze.maze[0])
+    turns = jumpFlags(grid, numCols, exit)
+    numCells = len(grid)
+    (exitRow, exitCol) = divmod(exit, numCols)
+
+    # The moves by direction: 0 up, 1 down, 2 left, 3 right.
+    steps = [-numCols, numCols, -1, 1]
+
+    # Best known g and prev state of each state = 4*cell + direction
+    g = array('i', [-1])*(4*numCells)
+    prev = array('i', [-1])*(4*numCells)
+    closed = bytearray(4*numCells)
+
+    # Start with only the start in the heap
+    (r, c) = divmod(start, numCols)
+    g[4*start] = 0
+    heap = [(abs(r-exitRow) + abs(c-exitCol), 0, 4*start)]
+    maze.pushed += 1
+
+    # Expand the jump point with the smallest f until the exit is expanded
+    found = -1
+    while len(heap) > 0:
+        (f, negG, state) = heapq.heappop(heap)
+        # Skip outdated entries of states already expanded
+        if closed[state]:
+            continue
+        closed[state] = 1
+        maze.expanded += 1
+        (current, d) = divmod(state, 4)
+        if current == exit:
+            found = state
+            break
+
+        # The directions the search may continue in from here
+        if current == start:
+            dirs = [0, 1, 2, 3]
+        elif d < 2:
+            # Arrived vertically: go on, or turn left or right
+            dirs = [d, 2, 3]
+        else:
+            # Arrived horizontally: go on, or turn at a forced neighbor
+            dirs = [d]
+            behind = current - steps[d]
+            for v in [0, 1]:
+                if isOpen(grid, current + steps[v]) and \
+                   not isOpen(grid, behind + steps[v]):
+                    dirs.append(v)
+
+        # Jump in each direction and push the jump points found
+        for nd in dirs:
+            if nd < 2:
+                j = jumpVertical(grid, turns, current, steps[nd], exit)
+            else:
+                j = jumpHorizontal(grid, current, steps[nd], numCols, exit)
+            if j < 0:
+                continue
+            newG = g[state] + abs(j - current)//abs(steps[nd])
+            newState = 4*j + nd
+            if not closed[newState] and (g[newState] < 0 or \
+                                         newG < g[newState]):
+                g[newState] = newG
+                prev[newState] = state
+                (r, c) = divmod(j, numCols)
+                h = abs(r-exitRow) + abs(c-exitCol)
+                heapq.heappush(heap, (newG + h, -newG, newState))
+                maze.pushed += 1
+
+    # No path if the heap ran out first
+    if found < 0:
+        return []
+
+    # Collect the jump points from the exit back to the start
+    jumpPoints = []
+    state = found
+    while state >= 0:
+        jumpPoints.append(state//4)
+        state = prev[state]
+    jumpPoints = jumpPoints[::-1]
+
+    # Fill in the straight runs between consecutive jump points
+    maze.path = [start]
+    for ind in range(1, len(jumpPoints)):
+        (a, b) = (jumpPoints[ind-1], jumpPoints[ind])
+        if a//numCols == b//numCols:
+            step = 1 if b > a else -1
+        else:
+            step = numCols if b > a else -numCols
+        maze.path.extend(range(a + step, b + step, step))
+
+    return maze.path
+
+"""
+JPS helper functions:
+    jpsGrid
+    jumpFlags
+    spreadStops
+    isOpen
+    jumpHorizontal
+    jumpVertical
+"""
+
+"""
+jpsGrid: this function returns the maze as a bytearray with one byte per
+rank, 0 for open and 1 for blocked. The outer wall is blocked except for
+the start and exit, so that moving between open cells that share a side is
+the same as being a neighbor in the maze. A CompactMaze already has this
+layout, so its grid is copied instead of read cell by cell.
+"""
+def jpsGrid(maze):
+    if maze.compact:
+        grid = bytearray(maze.grid)
+    else:
+        grid = bytearray(1 if cell else 0 for row in maze.maze for cell in row)
+    numRows = len(maze.maze)
+    numCols = len(maze.maze[0])
+    for c in range(0, numCols):
+        grid[c] = 1
+        grid[(numRows-1)*numCols + c] = 1
+    for r in range(0, numRows):
+        grid[r*numCols] = 1
+        grid[r*numCols + numCols-1] = 1
+    grid[maze.start.rank] = 0
+    grid[maze.exit.rank] = 0
+    return grid
+
+"""
+jumpFlags: this function returns a bytearray with one byte per rank, 1 if a
+horizontal jump from that rank (to the left or to the right) finds a jump
+point, and 0 otherwise, so that jumpVertical checks each cell in O(1). The
+flags of all cells are computed at once on big ints that hold one byte per
+rank: shifting by 8*numCols bits moves a whole row, and bitwise operations
+combine whole rows in C instead of one cell at a time.
+"""
+def jumpFlags(grid, numCols, exit):
+    # Pad a blocked row and a cell on each side, so that ranks outside the
+    # grid read as blocked, as in isOpen
+    pad = numCols + 1
+    size = len(grid) + 2*pad
+    ones = int.from_bytes(b'\x01'*size, 'little')
+    everything = (1 << 8*size) - 1
+    blocked = int.from_bytes(b'\x01'*pad + bytes(grid) + b'\x01'*pad, \
+                             'little')
+    opened = ones ^ blocked
+    row = 8*numCols
+
+    # The cells a horizontal jump stops at: the exit, and the open cells with
+    # a forced neighbor above or below, whose counterpart in the previous
+    # column (on the left when moving right) is blocked
+    exitByte = 1 << 8*(exit + pad)
+    stopsRight = opened & (((opened << row) & (blocked << (row + 8))) | \
+                           ((opened >> row) & (blocked >> (row - 8))))
+    stopsLeft = opened & (((opened << row) & (blocked << (row - 8))) | \
+                          ((opened >> row) & (blocked >> (row + 8))))
+    stopsRight = (stopsRight | exitByte) & everything
+    stopsLeft = (stopsLeft | exitByte) & everything
+
+    # A jump to the left from x finds a jump point if x - 1 is reached by
+    # spreading the stops to the right. Jumps to the right are the same with
+    # the bytes reversed.
+    def flip(value):
+        return int.from_bytes(value.to_bytes(size, 'little'), 'big')
+    reachLeft = spreadStops(opened*255, stopsLeft, ones)
+    reachRight = flip(spreadStops(flip(opened*255), flip(stopsRight), ones))
+    flags = ((reachLeft << 8) | (reachRight >> 8)) & everything
+    return bytearray(flags.to_bytes(size, 'little')[pad:pad + len(grid)])
+
+"""
+spreadStops: this function takes big ints with one byte per rank, openRun
+with 255 for each open cell and 0 for each blocked one, and stops with 1 for
+some of the open cells. It returns the big int with 1 for every cell that
+has a stop at or before it in the same run of open cells, and 0 elsewhere.
+Adding a stop to its run carries through the 255 bytes to the end of the
+run and clears them.
+"""
+def spreadStops(openRun, stops, ones):
+    return ((openRun & ~(openRun + stops)) | stops) & ones
+
+"""
+isOpen: this function checks if rank v is inside the grid and open.
+"""
+def isOpen(grid, v):
+    return 0 <= v < len(grid) and grid[v] == 0
+
+"""
+jumpHorizontal: this function moves from rank x along its row by step (-1 or
+1) and returns the first rank that is the exit or has a forced neighbor
+(an open cell above or below it, whose counterpart in the previous column
+is blocked), or -1 if a blocked cell is reached first.
+"""
+def jumpHorizontal(grid, x, step, numCols, exit):
+    while True:
+        y = x + step
+        if not isOpen(grid, y):
+            return -1
+        if y == exit:
+            return y
+        for v in [-numCols, numCols]:
+            if isOpen(grid, y + v) and not isOpen(grid, x + v):
+                return y
+        x = y
+
+"""
+jumpVertical: this function moves from rank x along its column by step
+(-numCols or numCols) and returns the first rank that is the exit or from
+which a horizontal jump finds a jump point (turns from jumpFlags), or -1 if
+a blocked cell is reached first.
+"""
+def jumpVertical(grid, turns, x, step, exit):
+    while True:
+        y = x + step
+        if not isOpen(grid, y):
+            return -1
+        if y == exit or turns[y]:
+            return y
+        x = y
+
 """
 Main function.
 """